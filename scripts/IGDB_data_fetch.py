@@ -1,17 +1,19 @@
 # scripts/igdb_fetch_shooters.py
+import csv
+import io
 import json
 import time
 from pathlib import Path
 import sys
 import requests
-import pandas as pd
 
 # make repo root importable so "src" works no matter where you run from
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
+from src.checkpoint import CheckpointedSink, atomic_write_text
+
 ASSETS = ROOT / "assets"
-ASSETS.mkdir(parents=True, exist_ok=True)
 
 DATA_DIR = ROOT / "data"
 TOKENS_PATH = DATA_DIR / "twitch_tokens.json"
@@ -23,6 +25,10 @@ GENRE_ID      = 5            # Shooter = 5
 MAX_ITEMS     = 500          # IGDB max per request
 OUT_CSV       = ASSETS / "igdb_games.csv"
 
+# Resumable staging: pages land here (one JSON object per game) with the page cursor
+STAGE_PATH    = DATA_DIR / "igdb" / "games_stage.jsonl"
+STAGE_STATE   = DATA_DIR / "igdb" / "games_stage_state.json"
+
 # Optional polite pacing
 SLEEP_BETWEEN_PAGES = 0.2
 
@@ -55,8 +61,11 @@ def main():
     request_url = IGDB_BASE_URL + ENDPOINT
 
     # --- 2) Fetch all shooter games in pages of 500 (sorted by name asc)
-    counter = 0
-    all_rows = []
+    # Each page + its cursor is committed atomically, so a rerun resumes after the last good page
+    sink = CheckpointedSink(STAGE_PATH, STAGE_STATE, fmt="jsonl", fsync_every=10)
+    counter = int(sink.state.get("page", 0))
+    if counter:
+        print(f"Resuming at page {counter}")
 
     while True:
         # IGDB query language: https://api-docs.igdb.com/#filters
@@ -79,14 +88,27 @@ def main():
         if not page:
             break
 
-        all_rows.extend(page)
         counter += 1
+        sink.write_rows(page)
+        sink.checkpoint(page=counter)
         time.sleep(SLEEP_BETWEEN_PAGES)
-
-    # --- 3) Write CSV
-    df = pd.DataFrame(all_rows)
-    df.to_csv(OUT_CSV, index=False, encoding="utf-8")
-    print(f"Saved {len(df):,} rows to {OUT_CSV}")
+    sink.close()
+
+    # --- 3) Write CSV (columns = union of keys in first-seen order, lists as "[5, 31]")
+    with open(STAGE_PATH, encoding="utf-8") as f:
+        all_rows = [json.loads(line) for line in f if line.strip()]
+    fieldnames = list(dict.fromkeys(k for row in all_rows for k in row))
+    buf = io.StringIO()
+    w = csv.DictWriter(buf, fieldnames=fieldnames)
+    w.writeheader()
+    w.writerows(all_rows)
+    atomic_write_text(OUT_CSV, buf.getvalue(), fsync=True)
+    print(f"Saved {len(all_rows):,} rows to {OUT_CSV}")
+
+    # Full pull done: clear the staging area so the next sync starts from page 0
+    # (state first; a stage file left without state is truncated as uncommitted)
+    STAGE_STATE.unlink(missing_ok=True)
+    STAGE_PATH.unlink()
 
 
 if __name__ == "__main__":
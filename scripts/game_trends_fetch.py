@@ -1,6 +1,7 @@
 # Pairwise-at-peak heatmap via 2-term requests only (no stitching).
 # For each row game i (with peak month p_i), query [i, j], then rescale so i at p_i == 100.
 
+import sys
 import time
 from pathlib import Path
 import pandas as pd
@@ -15,14 +16,20 @@ TIMEFRAME = "2004-01-01 2025-12-31"  # wide; monthly resampling applied
 GEO, GPROP, CAT = "", "", 0
 SLEEP = 1.0
 
-ASSETS = Path("assets")
-peaks = pd.read_csv(ASSETS / "trends_peaks_single.csv")   # from single-term run
-# expect columns: game, peak_value, peak_month (YYYY-MM)
-peak_map = dict(zip(peaks["game"], peaks["peak_month"]))
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
 
-py = TrendReq(hl="en-US", tz=0)
+from src.checkpoint import CheckpointedSink, atomic_write_text
 
-def monthly_pair(term_a, term_b):
+ASSETS = ROOT / "assets"
+OUT_CSV = ASSETS / "trends_heatmap_pairwise.csv"
+
+# Resumable staging: finished rows land here with the row cursor; OUT_CSV is only
+# replaced once every row is done, so a failed rerun keeps the last complete heatmap
+STAGE_PATH = ROOT / "data" / "trends" / "heatmap_pairwise_stage.csv"
+STAGE_STATE = ROOT / "data" / "trends" / "heatmap_pairwise_stage_state.json"
+
+def monthly_pair(py, term_a, term_b):
     py.build_payload([term_a, term_b], timeframe=TIMEFRAME, geo=GEO, gprop=GPROP, cat=CAT)
     df = py.interest_over_time()
     if df is None or df.empty:
@@ -36,47 +43,70 @@ def monthly_pair(term_a, term_b):
             df = df.resample("MS").mean()
     return df[[term_a, term_b]].astype(float)
 
-# Build matrix
-rows = []
-for i, gi in enumerate(GAMES):
-    pi = peak_map.get(gi)
-    if not pi:
-        continue
-    month_i = pd.to_datetime(pi + "-01")
-    row_vals = {}
-    for j, gj in enumerate(GAMES):
-        if gi == gj:
-            row_vals[gj] = 100.0
-            continue
-        df_pair = monthly_pair(gi, gj)
-        if df_pair.empty:
-            row_vals[gj] = np.nan
-        else:
-            # align: if exact month not present, choose nearest monthly index
-            if month_i not in df_pair.index:
-                # nearest index
-                idx = df_pair.index.union(pd.DatetimeIndex([month_i])).sort_values().get_indexer([month_i], method="nearest")[0]
-                month_use = df_pair.index[max(0, min(idx, len(df_pair.index)-1))]
-            else:
-                month_use = month_i
+def main():
+    peaks = pd.read_csv(ASSETS / "trends_peaks_single.csv")   # from single-term run
+    # expect columns: game, peak_value, peak_month (YYYY-MM)
+    peak_map = dict(zip(peaks["game"], peaks["peak_month"]))
+
+    py = TrendReq(hl="en-US", tz=0)
 
-            val_i = float(df_pair.loc[month_use, gi]) if month_use in df_pair.index else np.nan
-            val_j = float(df_pair.loc[month_use, gj]) if month_use in df_pair.index else np.nan
+    # Build matrix; each finished row is committed with the cursor, so reruns resume
+    sink = CheckpointedSink(STAGE_PATH, STAGE_STATE, fieldnames=[""] + GAMES)
+    done = sink.state.get("done", 0)
 
-            if not np.isfinite(val_i) or val_i == 0:
+    for i, gi in enumerate(GAMES):
+        if i < done:
+            continue
+        pi = peak_map.get(gi)
+        if not pi:
+            sink.checkpoint(done=i + 1)
+            continue
+        month_i = pd.to_datetime(pi + "-01")
+        row_vals = {}
+        for j, gj in enumerate(GAMES):
+            if gi == gj:
+                row_vals[gj] = 100.0
+                continue
+            df_pair = monthly_pair(py, gi, gj)
+            if df_pair.empty:
                 row_vals[gj] = np.nan
             else:
-                # scale so gi at its peak month equals 100 in this pair
-                scale = 100.0 / val_i
-                row_vals[gj] = round(val_j * scale, 2)
+                # align: if exact month not present, choose nearest monthly index
+                if month_i not in df_pair.index:
+                    # nearest index
+                    idx = df_pair.index.union(pd.DatetimeIndex([month_i])).sort_values().get_indexer([month_i], method="nearest")[0]
+                    month_use = df_pair.index[max(0, min(idx, len(df_pair.index)-1))]
+                else:
+                    month_use = month_i
+
+                val_i = float(df_pair.loc[month_use, gi]) if month_use in df_pair.index else np.nan
+                val_j = float(df_pair.loc[month_use, gj]) if month_use in df_pair.index else np.nan
+
+                if not np.isfinite(val_i) or val_i == 0:
+                    row_vals[gj] = np.nan
+                else:
+                    # scale so gi at its peak month equals 100 in this pair
+                    scale = 100.0 / val_i
+                    row_vals[gj] = round(val_j * scale, 2)
+
+            if j < len(GAMES) - 1:
+                time.sleep(SLEEP)
+
+        sink.write({"": f"peak@{gi} ({pi})", **{g: ("" if np.isnan(v) else v) for g, v in row_vals.items()}})
+        sink.checkpoint(done=i + 1)
+    sink.close()
+
+    # All rows staged: publish the heatmap in one atomic replace, then clear the staging area
+    atomic_write_text(OUT_CSV, STAGE_PATH.read_text(encoding="utf-8"), fsync=True)
+    # (state first; a stage file left without state is truncated as uncommitted)
+    STAGE_STATE.unlink(missing_ok=True)
+    STAGE_PATH.unlink()
 
-        if j < len(GAMES) - 1:
-            time.sleep(SLEEP)
+    pair_heat = pd.read_csv(OUT_CSV, index_col=0)
 
-    rows.append(pd.Series(row_vals, name=f"peak@{gi} ({pi})"))
+    print("Saved pairwise-at-peak heatmap → assets/trends_heatmap_pairwise.csv")
+    return pair_heat
 
-pair_heat = pd.DataFrame(rows)
-pair_heat.to_csv(ASSETS / "trends_heatmap_pairwise.csv")
 
-print("Saved pairwise-at-peak heatmap → assets/trends_heatmap_pairwise.csv")
-pair_heat.head()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
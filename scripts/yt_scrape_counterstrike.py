@@ -7,8 +7,8 @@ sys.path.append(str(Path(__file__).resolve().parents[1]))
 from src.youtube.scraper import scrape_monthly_top50
 
 ROOT = Path(__file__).resolve().parents[1]
-ASSETS = ROOT / "assets"; ASSETS.mkdir(parents=True, exist_ok=True)
-DATA   = ROOT / "data";   DATA.mkdir(parents=True, exist_ok=True)
+ASSETS = ROOT / "assets"
+DATA   = ROOT / "data"
 
 CSV   = ASSETS / "yt_counter_strike_monthly_top50.csv"
 STATE = ASSETS / "yt_counter_strike_monthly_state.json"
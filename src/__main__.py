@@ -0,0 +1,6 @@
+# python -m src ... == btc ...
+import sys
+
+from src.cli import main
+
+sys.exit(main())
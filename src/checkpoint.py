@@ -0,0 +1,208 @@
+# src/checkpoint.py
+# Crash-safe, batched row sink for resumable collectors (YouTube, IGDB, Trends).
+#
+# Rows are buffered in memory and appended to the data file in one write per commit;
+# the collector's cursor is committed in the same step by atomically replacing a
+# small state file (temp file + rename) that also records the data file's size.
+# The state file is the commit point: on open, any bytes past the recorded size
+# (rows written after the last commit) are truncated, so data and cursor always agree.
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence
+
+OFFSET_KEY = "data_offset"
+
+
+# --------- helpers ---------
+def _fsync_dir(path: Path) -> None:
+    """Persist a rename on POSIX; directories can't be opened for fsync on Windows."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def atomic_write_text(path: Path | str, text: str, fsync: bool = False) -> None:
+    """Write `text` to `path` via temp file + rename so readers never see a partial file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        f.write(text)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+    if fsync:
+        _fsync_dir(path.parent)
+
+
+# --------- sink ---------
+class CheckpointedSink:
+    """
+    Usage:
+        with CheckpointedSink(csv_path, state_path, fieldnames=FIELDS) as sink:
+            for month in months:
+                if sink.state.get("cursor") and month <= sink.state["cursor"]: continue
+                sink.write_rows(fetch(month))
+                sink.checkpoint(cursor=month)
+
+    - `checkpoint(**state)` marks every row written so far as belonging to `state`.
+      Every `commit_every` checkpoints (or once `max_buffer` rows are pending) the
+      marked rows and that state are committed together.
+    - Rows written after the last checkpoint are never committed; the cursor did not
+      move past them, so a resumed run fetches them again.
+    - Data is fsynced on every commit before the state that references it is
+      published, so a state file never points past durable data. Every
+      `fsync_every`-th commit also fsyncs the state file and directory; a power loss
+      can roll back at most the commits since then (to an older, consistent state).
+    - fmt="csv" needs `fieldnames` (header written for new files); fmt="jsonl"
+      writes one JSON object per line, for records without a fixed schema.
+    """
+    def __init__(
+        self,
+        data_path: Path | str,
+        state_path: Path | str,
+        fieldnames: Optional[Sequence[str]] = None,
+        fmt: str = "csv",
+        commit_every: int = 1,
+        fsync_every: int = 1,
+        max_buffer: int = 10_000,
+    ):
+        if fmt not in ("csv", "jsonl"):
+            raise ValueError(f"Unknown sink format: {fmt}")
+        if fmt == "csv" and not fieldnames:
+            raise ValueError("CSV sinks need fieldnames")
+        self.data_path = Path(data_path)
+        self.state_path = Path(state_path)
+        self.fieldnames = list(fieldnames or [])
+        self.fmt = fmt
+        self.commit_every = max(1, commit_every)
+        self.fsync_every = max(0, fsync_every)
+
+        self.max_buffer = max_buffer
+        self._rows: List[dict] = []
+        self._marked = 0            # rows covered by the staged state
+        self._staged: Optional[dict] = None
+        self._since_commit = 0
+        self._commits = 0
+
+        self.data_path.parent.mkdir(parents=True, exist_ok=True)
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.state = self._recover()
+        self._f = open(self.data_path, "ab")
+        self._prefix = self._header() if self._f.tell() == 0 else b""
+
+    # ---- recovery ----
+    def _load_state(self) -> dict:
+        if not self.state_path.exists():
+            return {}
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+
+    def _recover(self) -> dict:
+        state = self._load_state()
+        size = self.data_path.stat().st_size if self.data_path.exists() else 0
+        offset = state.get(OFFSET_KEY)
+        if offset is None:
+            if state:
+                # state written before this sink existed (it has a cursor): trust the file as-is
+                return state
+            # nothing committed yet: rows from a first commit that crashed before its state
+            # was published are orphans, and their cursor never moved past them
+            offset = 0
+        if size < offset:
+            raise RuntimeError(
+                f"{self.data_path} is shorter ({size} B) than its checkpoint in "
+                f"{self.state_path} ({offset} B); it was modified outside the sink or "
+                f"was truncated. Restore both files from a backup, or delete both "
+                f"(data and state) to start the collection over."
+            )
+        if size > offset:
+            with open(self.data_path, "r+b") as f:
+                f.truncate(offset)
+        return state
+
+    def _header(self) -> bytes:
+        if self.fmt != "csv":
+            return b""
+        buf = io.StringIO()
+        csv.writer(buf).writerow(self.fieldnames)
+        return buf.getvalue().encode("utf-8")
+
+    # ---- writes ----
+    def write(self, row: dict) -> None:
+        self._rows.append(row)
+
+    def write_rows(self, rows: Iterable[dict]) -> None:
+        self._rows.extend(rows)
+
+    def checkpoint(self, **state) -> bool:
+        """Stage `state` for all rows written so far; returns True if this triggered a commit."""
+        self._staged = {**(self._staged or self.state), **state}
+        self._marked = len(self._rows)
+        self._since_commit += 1
+        if self._since_commit >= self.commit_every or self._marked >= self.max_buffer:
+            self.commit()
+            return True
+        return False
+
+    def _encode(self, rows: List[dict]) -> bytes:
+        buf = io.StringIO()
+        if self.fmt == "csv":
+            csv.DictWriter(buf, fieldnames=self.fieldnames).writerows(rows)
+        else:
+            for row in rows:
+                buf.write(json.dumps(row, ensure_ascii=False))
+                buf.write("\n")
+        return buf.getvalue().encode("utf-8")
+
+    def commit(self, fsync: Optional[bool] = None) -> None:
+        """Append staged rows in one write, then atomically publish the matching state."""
+        if self._staged is None:
+            return
+        rows, self._rows = self._rows[:self._marked], self._rows[self._marked:]
+        self._commits += 1
+        if fsync is None:
+            fsync = bool(self.fsync_every) and self._commits % self.fsync_every == 0
+
+        self._f.write(self._prefix + self._encode(rows))
+        self._prefix = b""
+        self._f.flush()
+        os.fsync(self._f.fileno())  # data must be durable before a state that points at it
+
+        state = {**self._staged, OFFSET_KEY: self._f.tell()}
+        atomic_write_text(self.state_path, json.dumps(state, indent=2), fsync=fsync)
+        self.state = state
+        self._staged, self._marked, self._since_commit = None, 0, 0
+
+    def reset(self) -> None:
+        """Drop all committed data and state (start the collection over)."""
+        self._rows, self._staged, self._marked, self._since_commit = [], None, 0, 0
+        # publish the empty state first: a crash before the truncate is finished on reopen
+        self.state = {OFFSET_KEY: 0}
+        atomic_write_text(self.state_path, json.dumps(self.state, indent=2), fsync=True)
+        self._f.truncate(0)
+        self._f.seek(0)
+        self._prefix = self._header()
+
+    def close(self) -> None:
+        """Commit any checkpointed rows (fsynced) and close; un-checkpointed rows are dropped."""
+        self.commit(fsync=bool(self.fsync_every))
+        self._f.close()
+
+    def __enter__(self) -> "CheckpointedSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,205 @@
+# src/cli.py
+# `btc` — single entry point for the collectors and ETL steps, meant for cron.
+# Only argparse/pathlib are imported here; every subcommand imports its own
+# dependencies when it runs, so `btc --help` never pays for pandas/requests.
+
+from __future__ import annotations
+
+import argparse
+import runpy
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+ASSETS = ROOT / "assets"
+DATA = ROOT / "data"
+
+# `yt scrape` output, which `yt refresh` indexes by default
+YT_CSV = ASSETS / "yt_counter_strike_monthly_top50.csv"
+
+
+# --------- youtube ---------
+def _yt_scrape(args) -> int:
+    from src.youtube.scraper import scrape_monthly_top50
+
+    scrape_monthly_top50(
+        start=args.start,
+        end=args.end,
+        query=args.query,
+        csv_path=args.csv,
+        state_path=args.state,
+        tokens_path=args.tokens,
+        batch_size=args.batch_size,
+    )
+    return 0
+
+def _yt_refresh(args) -> int:
+    from src.youtube.text_index import build_or_update
+
+    if not args.csv.exists():
+        raise RuntimeError(f"{args.csv} not found. Run `btc yt scrape` first or pass --csv.")
+    build_or_update(args.csv, args.index)
+    if args.clean:
+        from src.loaders import clean_youtube, load_youtube
+
+        df = clean_youtube(load_youtube(args.csv))
+        df.to_csv(args.clean, encoding="utf-8", index=False, header=True)
+        print(f"Wrote {len(df)} months → {args.clean}")
+    return 0
+
+
+# --------- scripts ---------
+def _run_script(name: str) -> int:
+    runpy.run_path(str(ROOT / "scripts" / name), run_name="__main__")
+    return 0
+
+def _igdb_sync(args) -> int:
+    return _run_script("IGDB_data_fetch.py")
+
+def _trends(args) -> int:
+    return _run_script("game_trends_fetch.py")
+
+
+# --------- collectors ---------
+def _steam_poll(args) -> int:
+    from src.steam.poller import SteamPoller
+    from src.steam.store import TimeSeriesStore
+
+    with TimeSeriesStore(args.store) as store:
+        poller = SteamPoller(store)
+        try:
+            poller.run(interval=args.interval, rounds=args.rounds)
+        finally:
+            poller.close()
+    return 0
+
+def _twitch_sample(args) -> int:
+    from src.twitch.sampler import HelixClient, TwitchSampler
+
+    sampler = TwitchSampler(HelixClient.from_tokens(args.tokens), state_path=args.state)
+    try:
+        sampler.run(interval=args.interval, rounds=args.rounds)
+        if args.clean:
+            sampler.write_clean(args.clean)
+    finally:
+        sampler.close()
+    return 0
+
+
+# --------- etl / report ---------
+def _etl(args) -> int:
+    from src.franchises import load_registry, write_clean
+
+    registry = load_registry(args.registry)
+    written = write_clean(registry, clean_dir=args.clean_dir, raw_dir=args.raw_dir)
+    for path in written:
+        print(f"Wrote {path}")
+    return 0
+
+def _report(args) -> int:
+    if args.forecast:
+        from src.forecast import forecast_all, load_clean_series
+
+        _, metrics = forecast_all(
+            load_clean_series(args.clean_dir), model=args.model,
+            horizon=args.horizon, cache_path=args.cache,
+        )
+        print(metrics.round(1).to_string(index=False))
+        return 0
+
+    # csv module only: fast enough for cron health checks
+    import csv
+
+    for path in sorted(Path(args.clean_dir).glob("*_Clean.csv")):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        if len(rows) < 2:
+            print(f"{path.stem:45s} empty")
+            continue
+        header, first, last = rows[0], rows[1], rows[-1]
+        print(f"{path.stem:45s} {len(rows) - 1:5d} rows  {first[0]} → {last[0]}  {header[1]}={last[1]}")
+    return 0
+
+
+# --------- parser ---------
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="btc", description="Beyond The Crosshair data pipeline.")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    # yt
+    yt = sub.add_parser("yt", help="YouTube collection").add_subparsers(dest="yt_command", required=True)
+    s = yt.add_parser("scrape", help="Resumable monthly top-50 scrape")
+    s.add_argument("--start", default="2005-07", help="YYYY-MM, inclusive")
+    s.add_argument("--end", default="2025-10", help="YYYY-MM, exclusive")
+    s.add_argument("--query", default="counter strike")
+    s.add_argument("--csv", type=Path, default=YT_CSV)
+    s.add_argument("--state", type=Path, default=ASSETS / "yt_counter_strike_monthly_state.json")
+    s.add_argument("--tokens", type=Path, default=DATA / "tokens.json")
+    s.add_argument("--batch-size", type=int, default=50)
+    s.set_defaults(func=_yt_scrape)
+
+    s = yt.add_parser("refresh", help="Fold new scraped rows into the text index")
+    s.add_argument("--csv", type=Path, default=YT_CSV,
+                   help="CSV to index (default: the `yt scrape` output); one index per CSV")
+    s.add_argument("--index", type=Path, default=DATA / "youtube" / "text_index.json")
+    s.add_argument("--clean", type=Path, help="also write monthly sums to this clean CSV")
+    s.set_defaults(func=_yt_refresh)
+
+    # igdb
+    ig = sub.add_parser("igdb", help="IGDB collection").add_subparsers(dest="igdb_command", required=True)
+    ig.add_parser("sync", help="Fetch all IGDB games (scripts/IGDB_data_fetch.py)").set_defaults(func=_igdb_sync)
+
+    # trends
+    sub.add_parser("trends", help="Google Trends pairwise heatmap (scripts/game_trends_fetch.py)").set_defaults(func=_trends)
+
+    # steam
+    st = sub.add_parser("steam", help="Steam concurrent players").add_subparsers(dest="steam_command", required=True)
+    s = st.add_parser("poll", help="Poll current players into the time-series store")
+    s.add_argument("--store", type=Path, default=DATA / "steam")
+    s.add_argument("--interval", type=float, default=60)
+    s.add_argument("--rounds", type=int, default=1, help="0 = run forever")
+    s.set_defaults(func=_steam_poll)
+
+    # twitch
+    tw = sub.add_parser("twitch", help="Twitch Helix viewers").add_subparsers(dest="twitch_command", required=True)
+    s = tw.add_parser("sample", help="Snapshot live viewers into monthly aggregates")
+    s.add_argument("--tokens", type=Path, default=DATA / "twitch_tokens.json")
+    s.add_argument("--state", type=Path, default=DATA / "twitch" / "monthly_state.json")
+    s.add_argument("--interval", type=float, default=600)
+    s.add_argument("--rounds", type=int, default=1, help="0 = run forever")
+    s.add_argument("--clean", type=Path, help="also write the clean monthly CSV here")
+    s.set_defaults(func=_twitch_sample)
+
+    # etl
+    s = sub.add_parser("etl", help="Rebuild SteamDB clean CSVs from the franchise registry")
+    s.add_argument("--registry", type=Path, default=DATA / "franchises.json")
+    s.add_argument("--raw-dir", type=Path, default=ASSETS / "raw")
+    s.add_argument("--clean-dir", type=Path, default=ASSETS / "clean")
+    s.set_defaults(func=_etl)
+
+    # report
+    s = sub.add_parser("report", help="Summarize clean datasets (optionally with forecasts)")
+    s.add_argument("--clean-dir", type=Path, default=ASSETS / "clean")
+    s.add_argument("--forecast", action="store_true", help="fit/backtest all series and print metrics")
+    s.add_argument("--model", choices=["lsq", "ets"], default="lsq")
+    s.add_argument("--horizon", type=int, default=12)
+    s.add_argument("--cache", type=Path, default=DATA / "forecast_cache.json")
+    s.set_defaults(func=_report)
+    return p
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if getattr(args, "rounds", None) == 0:
+        args.rounds = None
+    try:
+        return args.func(args)
+    except (RuntimeError, FileNotFoundError) as e:
+        # expected user errors (missing tokens/inputs, bad checkpoints): no traceback
+        print(f"btc: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+# src/forecast.py
+# Batch forecasting for the aligned clean monthly series
+# (SteamDB / GG peaks, Twitch viewers, YouTube views).
+#
+# - "lsq": trend + Fourier seasonality on log1p(values), fitted for every series
+#   at once with batched normal equations (one np.linalg.solve over S×p×p).
+# - "ets": lightweight additive Holt-Winters on log1p(values), small grid search.
+# Rolling-origin backtests run in a process pool; fitted parameters and metrics
+# are cached by a hash of each series so only series with new months are refit.
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.checkpoint import atomic_write_text
+
+# Default locations
+CLEAN_DIR = Path("assets/clean")
+CACHE_PATH = Path("data/forecast_cache.json")
+
+# clean file glob -> value column forecast for every matching file
+SERIES_COLUMNS = {
+    "SteamDB_*_Clean.csv": "peak",
+    "GG_*_Clean.csv": "peak",
+    "Twitch_*_Clean.csv": "peak viewers",
+    "Youtube_*_Clean.csv": "viewCount",
+}
+
+SEASON = 12
+T_REF = pd.Timestamp("2000-01-01")
+RIDGE = 1e-6
+LSQ_WINDOW = 24  # trailing months per fit; full history drags the trend across eras
+
+ETS_GRID = (0.1, 0.3, 0.5, 0.8)
+
+
+# --------- data ---------
+def load_clean_series(clean_dir: Path | str = CLEAN_DIR) -> Dict[str, pd.Series]:
+    """One monthly series per clean CSV, named by file stem (e.g. 'SteamDB_Battlefield')."""
+    clean_dir = Path(clean_dir)
+    out = {}
+    for pattern, column in SERIES_COLUMNS.items():
+        for path in sorted(clean_dir.glob(pattern)):
+            df = pd.read_csv(path, usecols=["month", column], parse_dates=["month"])
+            s = df.set_index("month")[column].astype(float).dropna()
+            out[path.stem.removesuffix("_Clean")] = s[~s.index.duplicated()].sort_index()
+    return out
+
+def series_hash(s: pd.Series, config: dict) -> str:
+    h = hashlib.sha1()
+    h.update(s.index.to_numpy(dtype="datetime64[ns]").astype("int64").tobytes())
+    h.update(s.to_numpy(dtype="float64").tobytes())
+    h.update(json.dumps(config, sort_keys=True).encode())
+    return h.hexdigest()
+
+def _month_number(idx: pd.DatetimeIndex) -> np.ndarray:
+    return ((idx.year - T_REF.year) * 12 + (idx.month - T_REF.month)).to_numpy(dtype=float)
+
+def _future_index(last: pd.Timestamp, horizon: int) -> pd.DatetimeIndex:
+    return pd.date_range(last + pd.offsets.MonthBegin(1), periods=horizon, freq="MS")
+
+
+# --------- batched least squares ---------
+def design(idx: pd.DatetimeIndex, harmonics: int = 2) -> np.ndarray:
+    """[1, trend, cos/sin(2πk·m/12) for k=1..harmonics]; trend is in decades since T_REF."""
+    t = _month_number(idx)
+    cols = [np.ones_like(t), t / 120.0]
+    for k in range(1, harmonics + 1):
+        ang = 2 * np.pi * k * t / SEASON
+        cols += [np.cos(ang), np.sin(ang)]
+    return np.column_stack(cols)
+
+def fit_lsq(series: Dict[str, pd.Series], harmonics: int = 2, window: Optional[int] = LSQ_WINDOW) -> Dict[str, dict]:
+    """
+    Fit every series in one batch. Series are aligned on the union of their months;
+    a weight mask handles gaps, differing spans and the trailing `window`
+    (None = full history).
+    Series with fewer than p+2 points are skipped.
+    """
+    if not series:
+        return {}
+    names = list(series)
+    Y = pd.DataFrame({n: series[n] for n in names}).sort_index()
+    W = Y.notna().to_numpy()
+    if window:
+        # keep only each series' last `window` observations
+        rank_from_end = np.cumsum(W[::-1], axis=0)[::-1]
+        W = W & (rank_from_end <= window)
+    X = design(Y.index, harmonics)
+    Z = np.where(W, np.log1p(Y.clip(lower=0).to_numpy()), 0.0)
+
+    p = X.shape[1]
+    Wf = W.astype(float)
+    A = np.einsum("ts,tp,tq->spq", Wf, X, X) + RIDGE * np.eye(p)
+    b = np.einsum("ts,tp,ts->sp", Wf, X, Z)
+    coef = np.linalg.solve(A, b[..., None])[..., 0]
+
+    resid = np.where(W, Z - X @ coef.T, 0.0)
+    n = W.sum(axis=0)
+    sigma = np.sqrt((resid ** 2).sum(axis=0) / np.maximum(n - p, 1))
+
+    out = {}
+    for j, name in enumerate(names):
+        if n[j] < p + 2:
+            continue
+        out[name] = {
+            "model": "lsq",
+            "harmonics": harmonics,
+            "coef": coef[j].tolist(),
+            "sigma": float(sigma[j]),
+            "last": str(series[name].index.max().date()),
+        }
+    return out
+
+def _predict_lsq(params: dict, horizon: int) -> pd.DataFrame:
+    idx = _future_index(pd.Timestamp(params["last"]), horizon)
+    z = design(idx, params["harmonics"]) @ np.asarray(params["coef"])
+    band = 1.96 * params["sigma"]
+    return pd.DataFrame({
+        "forecast": np.expm1(z), "lower": np.expm1(z - band), "upper": np.expm1(z + band),
+    }, index=idx)
+
+
+# --------- ETS (additive Holt-Winters on log1p) ---------
+def _hw_run(z: np.ndarray, alpha: float, beta: float, gamma: float, m: int):
+    """One pass of additive Holt-Winters; returns (sse, level, trend, seasonals)."""
+    level, trend = z[:m].mean() if m else z[0], 0.0
+    season = (z[:m] - level).tolist() if m else []
+    sse = 0.0
+    for i in range(m or 1, len(z)):
+        s = season[i % m] if m else 0.0
+        err = z[i] - (level + trend + s)
+        sse += err * err
+        new_level = alpha * (z[i] - s) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        if m:
+            season[i % m] = gamma * (z[i] - new_level) + (1 - gamma) * s
+        level = new_level
+    return sse, level, trend, season
+
+def fit_ets(s: pd.Series) -> Optional[dict]:
+    """Grid-search alpha/beta/gamma; seasonality is dropped when there are < 2 full seasons."""
+    s = s.asfreq("MS").interpolate(limit_area="inside").dropna()
+    if len(s) < 4:
+        return None
+    z = np.log1p(s.clip(lower=0).to_numpy())
+    m = SEASON if len(z) >= 2 * SEASON else 0
+    best = None
+    for a, b, g in product(ETS_GRID, ETS_GRID, ETS_GRID if m else (0.0,)):
+        sse, level, trend, season = _hw_run(z, a, b, g, m)
+        if best is None or sse < best[0]:
+            best = (sse, a, b, g, level, trend, season)
+    sse, a, b, g, level, trend, season = best
+    n_fit = len(z) - (m or 1)
+    # rotate seasonals so index 0 is the month after the last observation
+    season = season[len(z) % m:] + season[:len(z) % m] if m else []
+    return {
+        "model": "ets",
+        "alpha": a, "beta": b, "gamma": g, "period": m,
+        "level": level, "trend": trend, "season": season,
+        "sigma": float(np.sqrt(sse / max(n_fit, 1))),
+        "last": str(s.index.max().date()),
+    }
+
+def _predict_ets(params: dict, horizon: int) -> pd.DataFrame:
+    idx = _future_index(pd.Timestamp(params["last"]), horizon)
+    h = np.arange(1, horizon + 1)
+    m = params["period"]
+    seas = np.asarray([params["season"][(k - 1) % m] for k in h]) if m else 0.0
+    z = params["level"] + h * params["trend"] + seas
+    band = 1.96 * params["sigma"] * np.sqrt(h)
+    return pd.DataFrame({
+        "forecast": np.expm1(z), "lower": np.expm1(z - band), "upper": np.expm1(z + band),
+    }, index=idx)
+
+
+# --------- fit / predict dispatch ---------
+def fit_batch(series: Dict[str, pd.Series], model: str = "lsq", **kwargs) -> Dict[str, dict]:
+    if model == "lsq":
+        return fit_lsq(series, **kwargs)
+    if model == "ets":
+        fitted = {name: fit_ets(s) for name, s in series.items()}
+        return {name: p for name, p in fitted.items() if p is not None}
+    raise ValueError(f"Unknown model: {model}")
+
+def predict(params: dict, horizon: int) -> pd.DataFrame:
+    if params["model"] == "lsq":
+        return _predict_lsq(params, horizon)
+    if params["model"] == "ets":
+        return _predict_ets(params, horizon)
+    raise ValueError(f"Unknown model: {params['model']}")
+
+
+# --------- rolling-origin backtests ---------
+def _backtest_chunk(args) -> Dict[str, dict]:
+    """Worker: every (series, origin) truncation in the chunk is fitted as one batch."""
+    chunk, model, horizon, origins, kwargs = args
+    train, tests = {}, {}
+    for name, s in chunk.items():
+        for k in range(origins, 0, -1):
+            cut = len(s) - horizon - (k - 1)
+            if cut < 4:
+                continue
+            train[(name, cut)] = s.iloc[:cut]
+            tests[(name, cut)] = s.iloc[cut:cut + horizon]
+    fitted = fit_batch(train, model, **kwargs)
+
+    errs: Dict[str, List[np.ndarray]] = {}
+    for key, params in fitted.items():
+        actual = tests[key]
+        fc = predict(params, horizon)["forecast"].reindex(actual.index)
+        a, f = actual.to_numpy(), fc.to_numpy()
+        ok = np.isfinite(f)
+        errs.setdefault(key[0], []).append(np.column_stack([a[ok], f[ok]]))
+
+    out = {}
+    for name, parts in errs.items():
+        af = np.vstack(parts)
+        a, f = af[:, 0], af[:, 1]
+        nz = a != 0
+        out[name] = {
+            "mae": float(np.mean(np.abs(a - f))),
+            "mape": float(np.mean(np.abs((a[nz] - f[nz]) / a[nz])) * 100) if nz.any() else None,
+            "smape": float(np.mean(2 * np.abs(a - f) / np.maximum(np.abs(a) + np.abs(f), 1e-9)) * 100),
+            "n": int(len(a)),
+        }
+    return out
+
+def backtest(
+    series: Dict[str, pd.Series],
+    model: str = "lsq",
+    horizon: int = 6,
+    origins: int = 6,
+    workers: Optional[int] = None,
+    **kwargs,
+) -> Dict[str, dict]:
+    """Rolling-origin evaluation: `origins` cut points, each forecasting `horizon` months ahead."""
+    names = list(series)
+    if not names:
+        return {}
+    workers = workers or min(len(names), os.cpu_count() or 1)
+    chunks = [{n: series[n] for n in names[i::workers]} for i in range(workers)]
+    jobs = [(c, model, horizon, origins, kwargs) for c in chunks if c]
+    if workers == 1:
+        results = map(_backtest_chunk, jobs)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_backtest_chunk, jobs))
+    out = {}
+    for r in results:
+        out.update(r)
+    return out
+
+
+# --------- cache ---------
+class ForecastCache:
+    """{name: {'hash', 'params', 'metrics'}} persisted as JSON; entries are reused while the hash matches."""
+    def __init__(self, path: Path | str = CACHE_PATH):
+        self.path = Path(path)
+        self.entries: Dict[str, dict] = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except Exception:
+                self.entries = {}
+
+    def stale(self, hashes: Dict[str, str]) -> List[str]:
+        return [n for n, h in hashes.items() if self.entries.get(n, {}).get("hash") != h]
+
+    def save(self) -> None:
+        atomic_write_text(self.path, json.dumps(self.entries, indent=2))
+
+
+# --------- main entry ---------
+def forecast_all(
+    series: Optional[Dict[str, pd.Series]] = None,
+    model: str = "lsq",
+    horizon: int = 12,
+    backtest_horizon: int = 6,
+    origins: int = 6,
+    cache_path: Optional[Path | str] = None,
+    workers: Optional[int] = None,
+    **kwargs,
+) -> tuple:
+    """
+    Fit (or reuse cached) parameters for every series, run backtests for the refit
+    ones, and return (forecasts, metrics):
+    - forecasts: long frame series, month, forecast, lower, upper
+    - metrics:   one row per series with mae, mape, smape, n
+    """
+    series = series if series is not None else load_clean_series()
+    config = {"model": model, "bt_h": backtest_horizon, "origins": origins, **kwargs}
+    cache = ForecastCache(cache_path or CACHE_PATH)
+    hashes = {n: series_hash(s, config) for n, s in series.items()}
+    stale = cache.stale(hashes)
+
+    if stale:
+        subset = {n: series[n] for n in stale}
+        params = fit_batch(subset, model, **kwargs)
+        metrics = backtest(subset, model, backtest_horizon, origins, workers, **kwargs)
+        for n in stale:
+            cache.entries[n] = {"hash": hashes[n], "params": params.get(n), "metrics": metrics.get(n)}
+        cache.save()
+    print(f"Refit {len(stale)} of {len(series)} series ({model})")
+
+    frames, rows = [], []
+    for n in series:
+        entry = cache.entries.get(n) or {}
+        if entry.get("params"):
+            frames.append(predict(entry["params"], horizon).rename_axis("month").reset_index().assign(series=n))
+        rows.append({"series": n, **(entry.get("metrics") or {})})
+    forecasts = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if not forecasts.empty:
+        forecasts = forecasts[["series", "month", "forecast", "lower", "upper"]]
+    return forecasts, pd.DataFrame(rows)
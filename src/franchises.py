@@ -0,0 +1,175 @@
+# src/franchises.py
+# Config-driven franchise registry (data/franchises.json) and a vectorized
+# aggregation engine over SteamDB monthly tables.
+#
+# Every raw table is stacked into one long frame (source, month, peak, gain, % gain),
+# joined against the registry's era/window spec, and all title and franchise
+# totals, gains and shares are computed in a single groupby pass.
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# Default location
+REGISTRY_PATH = Path("data/franchises.json")
+
+FIELDS = ["month", "peak", "gain", "% gain"]
+NUMERIC = ["peak", "gain", "% gain"]
+
+_MIN_DATE = pd.Timestamp.min
+_MAX_DATE = pd.Timestamp.max
+
+
+# --------- registry ---------
+def load_registry(path: Path | str = REGISTRY_PATH) -> dict:
+    """Read the registry from JSON (or YAML, if the file ends in .yml/.yaml)."""
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix in (".yml", ".yaml"):
+        import yaml
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+def _window(spec: dict) -> tuple:
+    win = spec.get("window") or {}
+    start = pd.Timestamp(win["start"]) if win.get("start") else _MIN_DATE
+    end = pd.Timestamp(win["end"]) if win.get("end") else _MAX_DATE
+    return start, end
+
+def spec_frame(registry: dict) -> pd.DataFrame:
+    """
+    One row per (raw source, era): franchise, title, source, era bounds [from, until),
+    title window [win_start, win_end), clean file. A title without `eras` is a single
+    open-ended era; consecutive eras split one raw table at their `until` dates.
+    """
+    rows = []
+    for franchise, fspec in registry["franchises"].items():
+        for tspec in fspec["titles"]:
+            eras = tspec.get("eras") or [{"name": tspec["name"], "clean": tspec.get("clean")}]
+            win_start, win_end = _window(tspec)
+            lo = _MIN_DATE
+            for era in eras:
+                hi = pd.Timestamp(era["until"]) if era.get("until") else _MAX_DATE
+                rows.append({
+                    "franchise": franchise,
+                    "title": era["name"],
+                    "source": tspec["raw"],
+                    "era_from": lo,
+                    "era_until": hi,
+                    "win_start": win_start,
+                    "win_end": win_end,
+                    "clean": era.get("clean"),
+                })
+                lo = hi
+    return pd.DataFrame(rows)
+
+
+# --------- loading ---------
+def load_sources(sources: List[str], raw_dir: Path | str) -> pd.DataFrame:
+    """Stack SteamDB raw tables into one long frame and clean them in one vectorized pass."""
+    raw_dir = Path(raw_dir)
+    frames = []
+    for src in dict.fromkeys(sources):
+        df = pd.read_csv(raw_dir / src, dtype=str)
+        df.columns = df.columns.str.lower().str.replace("%gain", "% gain", regex=False)
+        frames.append(df[FIELDS].assign(source=src))
+    long = pd.concat(frames, ignore_index=True)
+
+    long[NUMERIC] = (
+        long[NUMERIC]
+        .replace("-", "0")
+        .replace({",": "", "%": ""}, regex=True)
+        .astype(float)
+    )
+    # Rows like "Last 30 days" don't parse as a month and are dropped here
+    long["month"] = pd.to_datetime(long["month"], format="%b-%y", errors="coerce")
+    long = long.dropna(subset=["month"])
+    long["source"] = long["source"].astype("category")
+    return long.reset_index(drop=True)
+
+
+# --------- aggregation ---------
+def _pct_gain(peak: pd.Series, by: pd.Series) -> pd.Series:
+    prev = peak.groupby(by, observed=True).shift(1)
+    return ((peak - prev) * 100 / prev).round(1).fillna(0.0)
+
+def aggregate(registry: dict, raw_dir: Optional[Path | str] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Build every aggregate in one pass. Returns:
+    - 'titles':     franchise, title, month, peak, gain, % gain, share (of franchise peak)
+    - 'franchises': franchise, month, peak, gain, % gain, share (of all tracked franchises)
+
+    Title gains are SteamDB's own per-title values. Franchise `gain` sums title gains,
+    `% gain` is recomputed from the summed peaks (first month 0) and the franchise
+    window is applied afterwards, matching the notebooks' order of operations.
+    """
+    specs = spec_frame(registry)
+    long = load_sources(specs["source"].tolist(), raw_dir or registry.get("raw_dir", "assets/raw"))
+
+    # Join every row with its source's eras, keep the era (and title window) it falls in
+    joined = long.merge(specs, on="source", how="inner")
+    m = joined["month"]
+    keep = (
+        (m >= joined["era_from"]) & (m < joined["era_until"])
+        & (m >= joined["win_start"]) & (m < joined["win_end"])
+    )
+    titles = joined.loc[keep, ["franchise", "title", *FIELDS]]
+    titles = titles.sort_values(["franchise", "title", "month"], kind="stable").reset_index(drop=True)
+
+    franchise_totals = titles.groupby(["franchise", "month"], as_index=False)[["peak", "gain"]].sum()
+    franchise_totals["% gain"] = _pct_gain(franchise_totals["peak"], franchise_totals["franchise"])
+
+    f_windows = pd.DataFrame(
+        [(name, *_window(fspec)) for name, fspec in registry["franchises"].items()],
+        columns=["franchise", "win_start", "win_end"],
+    )
+    franchise_totals = franchise_totals.merge(f_windows, on="franchise")
+    fm = franchise_totals["month"]
+    franchise_totals = franchise_totals[(fm >= franchise_totals["win_start"]) & (fm < franchise_totals["win_end"])]
+    franchise_totals = franchise_totals.drop(columns=["win_start", "win_end"]).reset_index(drop=True)
+
+    # Shares: title of its franchise, franchise of all franchises, per month
+    titles["share"] = titles["peak"] / titles.groupby(["franchise", "month"])["peak"].transform("sum")
+    franchise_totals["share"] = (
+        franchise_totals["peak"] / franchise_totals.groupby("month")["peak"].transform("sum")
+    )
+    return {"titles": titles, "franchises": franchise_totals}
+
+
+def write_clean(
+    registry: Optional[dict] = None,
+    clean_dir: Optional[Path | str] = None,
+    raw_dir: Optional[Path | str] = None,
+) -> List[Path]:
+    """Rebuild every clean CSV named in the registry (per title/era and per franchise)."""
+    registry = registry or load_registry()
+    clean_dir = Path(clean_dir or registry.get("clean_dir", "assets/clean"))
+    clean_dir.mkdir(parents=True, exist_ok=True)
+    out = aggregate(registry, raw_dir)
+    specs = spec_frame(registry)
+
+    written = []
+    for title, group in out["titles"].groupby("title", sort=False):
+        name = specs.loc[specs["title"] == title, "clean"].dropna()
+        if name.empty:
+            continue
+        path = clean_dir / name.iloc[0]
+        group[FIELDS].to_csv(path, encoding="utf-8", index=False, header=True)
+        written.append(path)
+    for franchise, group in out["franchises"].groupby("franchise", sort=False):
+        name = registry["franchises"][franchise].get("clean")
+        if not name:
+            continue
+        path = clean_dir / name
+        group[FIELDS].to_csv(path, encoding="utf-8", index=False, header=True)
+        written.append(path)
+    return written
+
+
+def wide(frame: pd.DataFrame, key: str = "franchise", value: str = "peak") -> pd.DataFrame:
+    """Pivot a long aggregate to one column per franchise/title, indexed by month."""
+    return frame.pivot_table(index="month", columns=key, values=value, aggfunc="sum").sort_index()
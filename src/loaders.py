@@ -0,0 +1,199 @@
+# src/loaders.py
+# Memory-lean, typed loaders for the large raw CSVs (YouTube scrape, IGDB pulls).
+# Chunked reads with column projection, compact dtypes, text loaded on demand,
+# and IGDB genres packed into a uint64 bitmask instead of per-row Python lists.
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Default locations
+YOUTUBE_CSV = Path("assets/raw/yt_counter_strike.csv")
+IGDB_PARTS = [Path(f"assets/raw/igdb_part{i}.csv") for i in (1, 2, 3)]
+GENRES_PATH = Path("data/genres.json")
+
+CHUNKSIZE = 100_000
+
+# ---- YouTube ----
+YOUTUBE_DTYPES = {
+    "videoId": "string",
+    "channelId": "category",
+    "channelTitle": "category",
+    "categoryId": "category",
+    "viewCount": "UInt64",
+    "likeCount": "Int32",
+    "commentCount": "Int32",
+    "favoriteCount": "Int32",
+}
+YOUTUBE_TEXT = ["title", "description"]
+YOUTUBE_COUNTS = ["viewCount", "likeCount", "commentCount", "favoriteCount"]
+
+# ---- IGDB ----
+IGDB_FIELDS = [
+    "id", "name", "first_release_date", "genres", "rating", "rating_count",
+    "total_rating", "total_rating_count", "aggregated_rating", "aggregated_rating_count",
+]
+IGDB_DTYPES = {
+    "id": "uint32",
+    "name": "string",
+    "first_release_date": "float64",  # epoch seconds, NaN when unknown
+    "genres": "string",
+    "rating": "float32",
+    "rating_count": "float32",
+    "total_rating": "float32",
+    "total_rating_count": "float32",
+    "aggregated_rating": "float32",
+    "aggregated_rating_count": "float32",
+}
+MAX_GENRE_ID = 63  # genre ids must fit in a uint64 bitmask
+
+
+# --------- helpers ---------
+def _concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate chunks, unioning categoricals so they stay categorical (plain concat upcasts to object)."""
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0].reset_index(drop=True)
+    cat_cols = [c for c, dt in chunks[0].dtypes.items() if isinstance(dt, pd.CategoricalDtype)]
+    merged = {
+        c: union_categoricals([ch[c] for ch in chunks], ignore_order=True) for c in cat_cols
+    }
+    out = pd.concat([ch.drop(columns=cat_cols) for ch in chunks], ignore_index=True)
+    for c in cat_cols:
+        out[c] = pd.Categorical(merged[c])
+    return out[list(chunks[0].columns)]
+
+def _read_chunks(
+    paths: Sequence[Path | str],
+    usecols: Sequence[str],
+    dtype: Dict[str, str],
+    chunksize: int,
+) -> Iterable[pd.DataFrame]:
+    dtype = {c: t for c, t in dtype.items() if c in usecols}
+    for path in paths:
+        yield from pd.read_csv(path, usecols=list(usecols), dtype=dtype, chunksize=chunksize)
+
+def load_genre_names(path: Path | str = GENRES_PATH) -> Dict[int, str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return {int(k): v for k, v in json.load(f).items()}
+
+
+# --------- YouTube ---------
+def load_youtube(
+    path: Path | str = YOUTUBE_CSV,
+    columns: Optional[Sequence[str]] = None,
+    chunksize: int = CHUNKSIZE,
+) -> pd.DataFrame:
+    """
+    Load the scraped video table without the heavy text columns.
+
+    Counts are nullable unsigned/int32, channel and category ids categorical,
+    `publishedAt` tz-naive datetime. Pass `columns` to project further.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    if columns is None:
+        columns = [c for c in header if c not in YOUTUBE_TEXT]
+    columns = [c for c in columns if c in header]
+
+    chunks = []
+    for chunk in _read_chunks([path], columns, YOUTUBE_DTYPES, chunksize):
+        if "publishedAt" in chunk:
+            chunk["publishedAt"] = pd.to_datetime(chunk["publishedAt"], utc=True).dt.tz_localize(None)
+        chunks.append(chunk)
+    return _concat_chunks(chunks)
+
+def load_youtube_text(
+    path: Path | str = YOUTUBE_CSV,
+    video_ids: Optional[Iterable[str]] = None,
+    columns: Sequence[str] = YOUTUBE_TEXT,
+    chunksize: int = CHUNKSIZE,
+) -> pd.DataFrame:
+    """Fetch text columns on demand, keeping only rows for `video_ids` (all rows if None)."""
+    wanted = None if video_ids is None else pd.Index(list(video_ids))
+    usecols = ["videoId", *columns]
+    dtype = {c: "string" for c in usecols}
+
+    chunks = []
+    for chunk in _read_chunks([path], usecols, dtype, chunksize):
+        if wanted is not None:
+            chunk = chunk[chunk["videoId"].isin(wanted)]
+        chunks.append(chunk)
+    return _concat_chunks(chunks).set_index("videoId") if chunks else pd.DataFrame(columns=usecols)
+
+def clean_youtube(df: pd.DataFrame, drop_top: int = 1) -> pd.DataFrame:
+    """
+    Monthly sums in the `Youtube_Counter-Strike_Clean.csv` schema. Drops the
+    `drop_top` most-viewed videos first (the notebook removes one outlier).
+    """
+    df = df[["publishedAt", *YOUTUBE_COUNTS]]
+    if drop_top:
+        df = df.drop(df["viewCount"].nlargest(drop_top).index)
+    month = df["publishedAt"].dt.to_period("M").dt.to_timestamp().rename("month")
+    out = df[YOUTUBE_COUNTS].groupby(month).sum()
+    return out.reset_index()
+
+
+# --------- IGDB ---------
+def pack_genres(genres: pd.Series) -> np.ndarray:
+    """
+    Vectorized "[5, 31]" -> uint64 bitmask with bit `g` set for each genre id `g`.
+    Missing/empty lists map to 0.
+    """
+    ids = genres.str.extractall(r"(\d+)")[0].astype("uint64")
+    if len(ids) and int(ids.max()) > MAX_GENRE_ID:
+        raise ValueError(f"Genre id {int(ids.max())} does not fit in a uint64 bitmask")
+    bits = np.left_shift(np.uint64(1), ids.to_numpy(dtype="uint64"))
+    # genre ids are unique per game, so summing distinct bits == OR-ing them
+    per_row = pd.Series(bits, index=ids.index.get_level_values(0)).groupby(level=0).sum()
+    mask = np.zeros(len(genres), dtype="uint64")
+    mask[genres.index.get_indexer(per_row.index)] = per_row.to_numpy(dtype="uint64")
+    return mask
+
+def genre_flags(mask: np.ndarray | pd.Series, genre_names: Optional[Dict[int, str]] = None) -> pd.DataFrame:
+    """One boolean column per genre name, computed with bit tests over the whole column."""
+    genre_names = genre_names or load_genre_names()
+    mask = np.asarray(mask, dtype="uint64")
+    return pd.DataFrame({
+        name: (mask >> np.uint64(gid)) & np.uint64(1) == 1
+        for gid, name in sorted(genre_names.items())
+    })
+
+def genre_lists(mask: np.ndarray | pd.Series, genre_names: Optional[Dict[int, str]] = None) -> pd.Series:
+    """Expand bitmasks back to lists of names (for `IGDB_Clean.csv`), ordered by genre id."""
+    genre_names = genre_names or load_genre_names()
+    names = np.array([name for _, name in sorted(genre_names.items())], dtype=object)
+    rows, cols = np.nonzero(genre_flags(mask, genre_names).to_numpy())
+    counts = np.bincount(rows, minlength=len(np.asarray(mask)))
+    return pd.Series([list(x) for x in np.split(names[cols], np.cumsum(counts)[:-1])], dtype=object)
+
+def load_igdb(
+    paths: Optional[Sequence[Path | str]] = None,
+    columns: Sequence[str] = IGDB_FIELDS,
+    chunksize: int = CHUNKSIZE,
+) -> pd.DataFrame:
+    """
+    Load the IGDB raw parts chunk by chunk. `genres` is replaced per chunk by a
+    uint64 bitmask, so the raw list strings are never held for the full table.
+    """
+    paths = paths or IGDB_PARTS
+    chunks = []
+    for chunk in _read_chunks(paths, columns, IGDB_DTYPES, chunksize):
+        if "genres" in chunk:
+            chunk["genres"] = pack_genres(chunk["genres"].reset_index(drop=True))
+        if "first_release_date" in chunk:
+            chunk["first_release_date"] = pd.to_datetime(chunk["first_release_date"], unit="s")
+        chunks.append(chunk)
+    return _concat_chunks(chunks)
+
+def clean_igdb(df: pd.DataFrame, genre_names: Optional[Dict[int, str]] = None) -> pd.DataFrame:
+    """Same filters as the IGDB notebook: rated, dated, released after 2004; genres as names."""
+    df = df.dropna(subset=["rating", "first_release_date"])
+    df = df[df["first_release_date"] > pd.Timestamp("2004-01-01")].reset_index(drop=True)
+    return df.assign(genres=genre_lists(df["genres"], genre_names))
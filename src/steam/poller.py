@@ -0,0 +1,225 @@
+# src/steam/poller.py
+# Concurrent Steam current-players poller feeding the binary time-series store,
+# plus derivation of the SteamDB-style clean monthly schema (month,peak,gain,% gain).
+
+from __future__ import annotations
+
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+import requests
+
+from src.checkpoint import atomic_write_text
+from src.steam.store import STORE_DIR, TimeSeriesStore
+
+CURRENT_PLAYERS_URL = "https://api.steampowered.com/ISteamUserStats/GetNumberOfCurrentPlayers/v1/"
+
+APP_LIST_URL = "https://api.steampowered.com/ISteamApps/GetAppList/v2/"
+
+# Default location of resolved app ids: {"apps": {"<store name>": appid or null}, "checked_at": ts}.
+# Edit "apps" to pin an id by hand.
+APP_IDS_PATH = Path("data/steam/app_ids.json")
+RESOLVE_RETRY = 7 * 86400  # seconds before names that did not resolve are looked up again
+
+# Steam app ids for the titles tracked in assets/raw/SteamDB *.csv.
+APPS: Dict[int, str] = {
+    10: "Counter-Strike",
+    80: "Counter-Strike Condition Zero",
+    240: "Counter-Strike Source",
+    730: "Counter-Strike 2",
+    311210: "Call of Duty Black Ops 3",
+    292730: "Call of Duty Infinite Warfare",
+    476600: "Call of Duty WWII",
+    1938090: "Call of Duty",  # Call of Duty HQ (MWII / MWIII / BO6), the "last3games" table
+    1238860: "Battlefield 4",
+    1238880: "Battlefield Hardline",
+    1238840: "Battlefield 1",
+    1238810: "Battlefield V",
+    1517290: "Battlefield 2042",
+}
+
+# Tracked titles without a pinned id above: Steam store name -> name used here.
+# Resolved against the Steam app list on first use and cached in APP_IDS_PATH.
+LOOKUP_APPS: Dict[str, str] = {
+    "Call of Duty: Black Ops 4": "Call of Duty Black Ops 4",
+    "Call of Duty: Modern Warfare": "Call of Duty Modern Warfare",
+    "Call of Duty: Black Ops Cold War": "Call of Duty Black Ops Cold War",
+    "Call of Duty: Vanguard": "Call of Duty Vanguard",
+}
+
+# Franchise -> app names (values of APPS / LOOKUP_APPS); see `franchise_appids`
+FRANCHISES: Dict[str, list] = {
+    "Counter-Strike": [
+        "Counter-Strike", "Counter-Strike Condition Zero", "Counter-Strike Source", "Counter-Strike 2",
+    ],
+    "Call of Duty": [
+        "Call of Duty Black Ops 3", "Call of Duty Infinite Warfare", "Call of Duty WWII",
+        "Call of Duty Black Ops 4", "Call of Duty Modern Warfare", "Call of Duty Black Ops Cold War",
+        "Call of Duty Vanguard", "Call of Duty",
+    ],
+    "Battlefield": [
+        "Battlefield 4", "Battlefield Hardline", "Battlefield 1", "Battlefield V", "Battlefield 2042",
+    ],
+}
+
+
+# --------- app ids ---------
+def _store_name(name: str) -> str:
+    """'Call of Duty®: Modern Warfare®' -> 'call of duty: modern warfare'."""
+    name = re.sub(r"[\u00ae\u2122\u00a9]", "", name)
+    return " ".join(name.split()).casefold()
+
+def resolve_app_ids(names: Iterable[str], url: str = APP_LIST_URL, timeout: float = 60) -> Dict[str, int]:
+    """
+    Look up Steam app ids by exact store name (trademark signs and case ignored).
+    Names with no match, or several (DLC, soundtracks, test apps), are left out.
+    """
+    wanted = {_store_name(n): n for n in names}
+    r = requests.get(url, timeout=timeout)
+    r.raise_for_status()
+    hits: Dict[str, list] = {}
+    for app in r.json().get("applist", {}).get("apps", []):
+        key = _store_name(app.get("name", ""))
+        if key in wanted:
+            hits.setdefault(wanted[key], []).append(int(app["appid"]))
+    out = {}
+    for name in wanted.values():
+        ids = sorted(set(hits.get(name, [])))
+        if len(ids) == 1:
+            out[name] = ids[0]
+        else:
+            print(f"{name}: {len(ids)} Steam apps match {ids}; pin the right one under \"apps\" in {APP_IDS_PATH}")
+    return out
+
+def load_apps(
+    path: Path | str = APP_IDS_PATH,
+    url: str = APP_LIST_URL,
+    retry_after: float = RESOLVE_RETRY,
+) -> Dict[int, str]:
+    """
+    APPS plus the LOOKUP_APPS ids cached in `path`. The Steam app list (the whole
+    catalogue) is only downloaded for names never looked up, or for names that did
+    not resolve once `retry_after` seconds have passed since the last lookup.
+    """
+    path = Path(path)
+    cache = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    ids: Dict[str, Optional[int]] = cache.get("apps", {})
+    stale = time.time() - cache.get("checked_at", 0) >= retry_after
+    missing = [n for n in LOOKUP_APPS if n not in ids or (ids[n] is None and stale)]
+    if missing:
+        try:
+            found = resolve_app_ids(missing, url=url)
+            ids.update({n: found.get(n) for n in missing})
+            atomic_write_text(path, json.dumps({"apps": ids, "checked_at": int(time.time())}, indent=2))
+        except (requests.RequestException, ValueError) as e:
+            print(f"Steam app list lookup failed ({e}); polling pinned apps only")
+    apps = dict(APPS)
+    apps.update({int(appid): LOOKUP_APPS[n] for n, appid in ids.items() if n in LOOKUP_APPS and appid})
+    return apps
+
+def franchise_appids(franchise: str, apps: Optional[Dict[int, str]] = None) -> list:
+    """App ids of `franchise` (see FRANCHISES) among `apps`, e.g. for `clean_monthly`."""
+    names = set(FRANCHISES[franchise])
+    return [appid for appid, name in (apps or APPS).items() if name in names]
+
+
+class SteamPoller:
+    """
+    Polls every app in `apps` concurrently each round and appends the results to
+    `store`. `url` can point at a local stub that serves
+    `{"response": {"player_count": N, "result": 1}}` for `?appid=N`.
+    """
+    def __init__(
+        self,
+        store: TimeSeriesStore,
+        apps: Optional[Dict[int, str]] = None,
+        url: str = CURRENT_PLAYERS_URL,
+        workers: int = 8,
+        timeout: float = 15,
+    ):
+        self.store = store
+        self.apps = apps or load_apps()
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+
+    def _fetch(self, appid: int) -> Optional[int]:
+        try:
+            r = self.session.get(self.url, params={"appid": appid}, timeout=self.timeout)
+            if r.status_code in (429, 500, 502, 503):
+                time.sleep(1.0)
+                r = self.session.get(self.url, params={"appid": appid}, timeout=self.timeout)
+            r.raise_for_status()
+            resp = r.json().get("response", {})
+        except (requests.RequestException, ValueError) as e:
+            print(f"{appid}: request failed ({e})")
+            return None
+        if resp.get("result") != 1 or "player_count" not in resp:
+            return None
+        return int(resp["player_count"])
+
+    def poll_once(self, commit: bool = True) -> Dict[int, int]:
+        """Sample all apps once under a single timestamp; failed apps are skipped this round."""
+        ts = int(time.time())
+        appids = list(self.apps)
+        counts = dict(zip(appids, self.pool.map(self._fetch, appids)))
+        samples = {a: c for a, c in counts.items() if c is not None}
+        self.store.append(ts, samples)
+        if commit:
+            self.store.commit()
+        return samples
+
+    def run(self, interval: float = 60, rounds: Optional[int] = None, fsync_every: int = 60) -> None:
+        """Poll every `interval` seconds (aligned to wall clock) for `rounds` rounds, or forever."""
+        n = 0
+        try:
+            while rounds is None or n < rounds:
+                t0 = time.time()
+                samples = self.poll_once(commit=False)
+                n += 1
+                self.store.commit(fsync=(n % fsync_every == 0))
+                print(f"round {n}: {len(samples)}/{len(self.apps)} apps sampled")
+                if rounds is None or n < rounds:
+                    time.sleep(max(0.0, interval - (time.time() - t0)))
+        finally:
+            self.store.commit(fsync=True)
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True)
+        self.session.close()
+
+
+# --------- derived clean schema ---------
+def clean_monthly(store: TimeSeriesStore, appids: Iterable[int]) -> pd.DataFrame:
+    """
+    Month peaks summed across `appids`, in the assets/clean SteamDB schema:
+    month, peak, gain, % gain (first row's gain and % gain set to 0, as in the notebooks).
+    """
+    roll = store.rollups("month")
+    roll = roll[pd.Series(roll["appid"]).isin(list(appids)).to_numpy()]
+    df = pd.DataFrame({
+        "month": pd.to_datetime(roll["start"].astype("int64"), unit="s"),
+        "peak": roll["max"].astype(float),
+    })
+    df = df.groupby("month", as_index=False)["peak"].sum().sort_values("month")
+    df["gain"] = df["peak"].diff().fillna(0.0)
+    df["% gain"] = (df["gain"] * 100 / df["peak"].shift(1)).round(1).fillna(0.0)
+    return df.reset_index(drop=True)
+
+
+def poll_forever(interval: float = 60, store_dir=STORE_DIR) -> None:
+    with TimeSeriesStore(store_dir) as store:
+        poller = SteamPoller(store)
+        try:
+            poller.run(interval=interval)
+        finally:
+            poller.close()
@@ -0,0 +1,197 @@
+# src/steam/store.py
+# Append-only binary time-series store for concurrent-player samples,
+# with incremental minute/hour/day/month rollups and bounded in-memory ring buffers.
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.checkpoint import atomic_write_text
+
+# Default location
+STORE_DIR = Path("data/steam")
+
+RESOLUTIONS = ["minute", "hour", "day", "month"]
+
+# On-disk records (little-endian, fixed width so files can be mmapped/np.fromfile'd)
+RAW_FMT = struct.Struct("<III")             # ts, appid, players
+ROLLUP_FMT = struct.Struct("<IIIIQI")       # start, appid, min, max, sum, count
+RAW_DTYPE = np.dtype([("ts", "<u4"), ("appid", "<u4"), ("players", "<u4")])
+ROLLUP_DTYPE = np.dtype([
+    ("start", "<u4"), ("appid", "<u4"), ("min", "<u4"),
+    ("max", "<u4"), ("sum", "<u8"), ("count", "<u4"),
+])
+
+RING_SIZE = 1440  # recent closed buckets kept in memory per resolution
+
+
+# --------- helpers ---------
+def bucket_start(ts: int, resolution: str) -> int:
+    """Floor an epoch timestamp (UTC) to the start of its bucket."""
+    if resolution == "minute":
+        return ts - ts % 60
+    if resolution == "hour":
+        return ts - ts % 3600
+    if resolution == "day":
+        return ts - ts % 86400
+    if resolution == "month":
+        dt = datetime.fromtimestamp(ts, tz=timezone.utc)
+        return int(datetime(dt.year, dt.month, 1, tzinfo=timezone.utc).timestamp())
+    raise ValueError(f"Unknown resolution: {resolution}")
+
+
+# --------- store ---------
+class TimeSeriesStore:
+    """
+    Layout under `root`:
+    - `samples.bin`   raw (ts, appid, players) records, append-only (the log)
+    - `<res>.bin`     closed rollup buckets per resolution, append-only
+    - `state.json`    checkpoint: file sizes covered + open buckets
+
+    `commit()` is the durability point. On open, rollup files are truncated back
+    to the checkpointed sizes and raw samples past the checkpoint are replayed,
+    so a crash mid-write never double-counts or drops a bucket.
+    """
+    def __init__(self, root: Path | str = STORE_DIR, ring_size: int = RING_SIZE):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.raw_path = self.root / "samples.bin"
+        self.state_path = self.root / "state.json"
+        self.rollup_paths = {res: self.root / f"{res}.bin" for res in RESOLUTIONS}
+
+        # (res, appid) -> [start, min, max, sum, count]
+        self.open: Dict[Tuple[str, int], list] = {}
+        self.recent: Dict[str, Deque[tuple]] = {res: deque(maxlen=ring_size) for res in RESOLUTIONS}
+        self.recent_samples: Deque[tuple] = deque(maxlen=ring_size)
+
+        raw_offset = self._recover()
+        self._raw = open(self.raw_path, "ab")
+        self._rollups = {res: open(p, "ab") for res, p in self.rollup_paths.items()}
+        self._replay(raw_offset)
+
+    # ---- recovery ----
+    def _recover(self) -> int:
+        state = {}
+        if self.state_path.exists():
+            try:
+                state = json.loads(self.state_path.read_text(encoding="utf-8"))
+            except Exception:
+                state = {}
+        sizes = state.get("rollup_sizes", {})
+        for res, path in self.rollup_paths.items():
+            if not path.exists():
+                continue
+            # clamp to the real size and whole records: never extend (that would pad zero buckets)
+            actual = path.stat().st_size
+            size = min(int(sizes.get(res, 0)), actual)
+            size -= size % ROLLUP_FMT.size
+            if actual != size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+        for key, bucket in state.get("open", {}).items():
+            res, appid = key.split(":")
+            self.open[(res, int(appid))] = bucket
+        return int(state.get("raw_offset", 0))
+
+    def _replay(self, offset: int) -> None:
+        if not self.raw_path.exists():
+            return
+        size = self.raw_path.stat().st_size
+        offset = min(offset, size - size % RAW_FMT.size)
+        usable = size - (size - offset) % RAW_FMT.size  # ignore a torn trailing record
+        if usable < size:
+            with open(self.raw_path, "r+b") as f:
+                f.truncate(usable)
+        if usable <= offset:
+            return
+        raw = np.fromfile(self.raw_path, dtype=RAW_DTYPE, offset=offset)
+        for ts, appid, players in raw.tolist():
+            self._fold(ts, appid, players)
+
+    # ---- writes ----
+    def _fold(self, ts: int, appid: int, players: int) -> None:
+        self.recent_samples.append((ts, appid, players))
+        for res in RESOLUTIONS:
+            start = bucket_start(ts, res)
+            key = (res, appid)
+            cur = self.open.get(key)
+            if cur is not None and cur[0] != start:
+                self._close(res, appid, cur)
+                cur = None
+            if cur is None:
+                self.open[key] = [start, players, players, players, 1]
+            else:
+                cur[1] = min(cur[1], players)
+                cur[2] = max(cur[2], players)
+                cur[3] += players
+                cur[4] += 1
+
+    def _close(self, res: str, appid: int, bucket: list) -> None:
+        start, lo, hi, total, count = bucket
+        self._rollups[res].write(ROLLUP_FMT.pack(start, appid, lo, hi, total, count))
+        self.recent[res].append((start, appid, lo, hi, total, count))
+
+    def append(self, ts: int, samples: Dict[int, int]) -> None:
+        """Log one poll round ({appid: players} sampled at `ts`) and fold it into the rollups."""
+        for appid, players in samples.items():
+            self._raw.write(RAW_FMT.pack(int(ts), int(appid), int(players)))
+            self._fold(int(ts), int(appid), int(players))
+
+    def commit(self, fsync: bool = False) -> None:
+        """
+        Flush and fsync data files, then atomically replace the checkpoint that covers
+        them, so the checkpoint never points past durable data. `fsync` also syncs the
+        checkpoint itself (otherwise a power loss may roll back to the previous one).
+        """
+        for f in [self._raw, *self._rollups.values()]:
+            f.flush()
+            os.fsync(f.fileno())
+        state = {
+            "raw_offset": self._raw.tell(),
+            "rollup_sizes": {res: f.tell() for res, f in self._rollups.items()},
+            "open": {f"{res}:{appid}": b for (res, appid), b in self.open.items()},
+        }
+        atomic_write_text(self.state_path, json.dumps(state), fsync=fsync)
+
+    def close(self) -> None:
+        self.commit()
+        for f in [self._raw, *self._rollups.values()]:
+            f.close()
+
+    def __enter__(self) -> "TimeSeriesStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---- reads ----
+    def rollups(self, resolution: str, include_open: bool = True) -> np.ndarray:
+        """All buckets at `resolution` as a ROLLUP_DTYPE array (closed, plus open ones if asked)."""
+        self._rollups[resolution].flush()
+        closed = np.fromfile(self.rollup_paths[resolution], dtype=ROLLUP_DTYPE)
+        if not include_open:
+            return closed
+        pending = [
+            (b[0], appid, b[1], b[2], b[3], b[4])
+            for (res, appid), b in self.open.items() if res == resolution
+        ]
+        return np.concatenate([closed, np.array(pending, dtype=ROLLUP_DTYPE)])
+
+    def samples(self, appids: Optional[Iterable[int]] = None) -> np.ndarray:
+        self._raw.flush()
+        raw = np.fromfile(self.raw_path, dtype=RAW_DTYPE)
+        if appids is not None:
+            raw = raw[np.isin(raw["appid"], list(appids))]
+        return raw
+
+    def latest(self, resolution: str) -> List[tuple]:
+        """Most recent closed buckets from the in-memory ring buffer."""
+        return list(self.recent[resolution])
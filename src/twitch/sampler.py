@@ -0,0 +1,286 @@
+# src/twitch/sampler.py
+# Twitch Helix live-viewer sampler for the Counter-Strike titles.
+# Pages /helix/streams per game (games in parallel, cursors followed per game),
+# honours Helix rate-limit headers, and folds each snapshot into O(1)-per-game
+# monthly aggregates that map onto Twitch_Counter-Strike_Clean.csv.
+
+from __future__ import annotations
+
+import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+import requests
+
+from src.checkpoint import atomic_write_text
+
+HELIX_URL = "https://api.twitch.tv/helix"
+
+# Default locations
+TOKENS_PATH = Path("data/twitch_tokens.json")   # written by scripts/twitch_oauth.py
+STATE_PATH = Path("data/twitch/monthly_state.json")
+
+# Twitch category names matching the TwitchTracker tables in assets/raw
+GAMES = [
+    "Counter-Strike",
+    "Counter-Strike 2",
+    "Counter-Strike: Condition Zero",
+    "Counter-Strike: Source",
+]
+
+PAGE_SIZE = 100          # Helix max for /streams
+MAX_GAP = 2 * 3600       # longest gap (s) credited to a single snapshot's hours watched
+
+CLEAN_FIELDS = [
+    "month", "avg viewers", "gain viewers", "peak viewers",
+    "avg streams", "gain streams", "peak streams", "hours watched",
+]
+
+
+# --------- helpers ---------
+def load_twitch_token(path: Path) -> dict:
+    if not path.exists():
+        raise RuntimeError(f"{path} not found. Run scripts/twitch_oauth.py first to create an app token.")
+    tok = json.loads(path.read_text())
+    if int(tok.get("expires_at", 0)) <= int(time.time()):
+        raise RuntimeError("Twitch app token expired. Re-run scripts/twitch_oauth.py to refresh.")
+    return tok
+
+def _month_label(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m")
+
+
+# --------- Helix client ---------
+class HelixClient:
+    """
+    Thread-safe Helix GET wrapper. Tracks `Ratelimit-Remaining` / `Ratelimit-Reset`
+    from every response and makes all threads wait for the bucket to refill
+    instead of burning requests into 429s.
+    """
+    def __init__(self, client_id: str, access_token: str, base_url: str = HELIX_URL, workers: int = 4):
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Client-ID": client_id,
+            "Authorization": f"Bearer {access_token}",
+            "Accept": "application/json",
+        })
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._remaining: Optional[int] = None
+        self._reset_at = 0.0
+
+    @classmethod
+    def from_tokens(cls, path: Path | str = TOKENS_PATH, **kwargs) -> "HelixClient":
+        tok = load_twitch_token(Path(path))
+        return cls(tok["client_id"], tok["access_token"], **kwargs)
+
+    def _wait_for_budget(self) -> None:
+        with self._lock:
+            if self._remaining is not None and self._remaining <= 1:
+                delay = self._reset_at - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                self._remaining = None
+            elif self._remaining is not None:
+                self._remaining -= 1  # reserve one before the response tells us the real value
+
+    def _note_limits(self, r: requests.Response) -> None:
+        remaining = r.headers.get("Ratelimit-Remaining")
+        reset = r.headers.get("Ratelimit-Reset")
+        with self._lock:
+            if remaining is not None:
+                self._remaining = int(remaining)
+            if reset is not None:
+                self._reset_at = float(reset)
+
+    def get(self, path: str, params: Optional[dict] = None, retries: int = 3) -> dict:
+        for _ in range(retries + 1):
+            self._wait_for_budget()
+            r = self.session.get(f"{self.base_url}/{path.lstrip('/')}", params=params, timeout=30)
+            self._note_limits(r)
+            if r.status_code == 429:
+                time.sleep(max(1.0, self._reset_at - time.time()))
+                continue
+            if r.status_code in (500, 502, 503):
+                time.sleep(2.0)
+                continue
+            r.raise_for_status()
+            return r.json()
+        r.raise_for_status()
+        raise RuntimeError(f"Helix request kept failing: {path} {r.status_code}")
+
+    def game_ids(self, names: Iterable[str]) -> Dict[str, str]:
+        """Resolve category names to Helix game ids (up to 100 names per call)."""
+        names = list(names)
+        out: Dict[str, str] = {}
+        for i in range(0, len(names), 100):
+            data = self.get("games", params=[("name", n) for n in names[i:i + 100]])
+            out.update({g["name"]: g["id"] for g in data.get("data", [])})
+        return out
+
+    def live_totals(self, game_id: str) -> Tuple[int, int]:
+        """
+        Follow the /streams cursor for one game; returns (total viewers, live streams).
+        Pages shift while they are read, so streams are deduplicated by id.
+        """
+        counts: Dict[str, int] = {}
+        cursor = None
+        while True:
+            params = {"game_id": game_id, "first": PAGE_SIZE, "type": "live"}
+            if cursor:
+                params["after"] = cursor
+            data = self.get("streams", params=params)
+            page = data.get("data", [])
+            for s in page:
+                counts[s["id"]] = int(s.get("viewer_count", 0))
+            cursor = (data.get("pagination") or {}).get("cursor")
+            if not page or not cursor:
+                return sum(counts.values()), len(counts)
+
+
+# --------- streaming monthly aggregates ---------
+class MonthlyAggregator:
+    """
+    Per (game, month) running totals — constant memory regardless of how many
+    snapshots are folded in:
+        viewer_hours, stream_hours, observed_hours, peak_viewers, peak_streams
+    plus the last snapshot per game (to turn instants into durations).
+    Averages are time-weighted: avg viewers = viewer_hours / observed_hours.
+    """
+    def __init__(self, state: Optional[dict] = None):
+        state = state or {}
+        self.months: Dict[str, Dict[str, list]] = state.get("months", {})
+        self.last: Dict[str, list] = state.get("last", {})
+
+    def fold(self, game: str, ts: float, viewers: int, streams: int) -> None:
+        prev = self.last.get(game)
+        dt = 0.0 if prev is None else min(max(ts - prev[0], 0.0), MAX_GAP)
+        hours = dt / 3600
+        month = self.months.setdefault(_month_label(ts), {})
+        cell = month.setdefault(game, [0.0, 0.0, 0.0, 0, 0])
+        cell[0] += viewers * hours
+        cell[1] += streams * hours
+        cell[2] += hours
+        cell[3] = max(cell[3], viewers)
+        cell[4] = max(cell[4], streams)
+        self.last[game] = [ts, viewers, streams]
+
+    def state(self) -> dict:
+        return {"months": self.months, "last": self.last}
+
+    def to_frame(self) -> pd.DataFrame:
+        """Clean TwitchTracker schema, summed across games per month like the notebook does."""
+        rows = []
+        for month, games in sorted(self.months.items()):
+            vh = sum(c[0] for c in games.values())
+            sh = sum(c[1] for c in games.values())
+            # average over each game's own observed hours, then add the games up
+            avg_v = sum(c[0] / c[2] for c in games.values() if c[2])
+            avg_s = sum(c[1] / c[2] for c in games.values() if c[2])
+            rows.append({
+                "month": pd.Timestamp(f"{month}-01"),
+                "avg viewers": round(avg_v),
+                "peak viewers": sum(c[3] for c in games.values()),
+                "avg streams": round(avg_s),
+                "peak streams": sum(c[4] for c in games.values()),
+                "hours watched": round(vh),
+            })
+        df = pd.DataFrame(rows, columns=[c for c in CLEAN_FIELDS if "gain" not in c]).astype(
+            {c: float for c in CLEAN_FIELDS if c != "month" and "gain" not in c}
+        )
+        df["gain viewers"] = df["peak viewers"].diff().fillna(0.0)
+        df["gain streams"] = df["peak streams"].diff().fillna(0.0)
+        return df[CLEAN_FIELDS]
+
+
+def _load_state(path: Path) -> dict:
+    if path.exists():
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+    return {}
+
+def _save_state(path: Path, state: dict) -> None:
+    atomic_write_text(path, json.dumps(state))
+
+
+# --------- sampler ---------
+class TwitchSampler:
+    """Snapshot all `games` in parallel and fold the totals into a persisted MonthlyAggregator."""
+    def __init__(
+        self,
+        client: HelixClient,
+        games: Optional[Iterable[str]] = None,
+        state_path: Optional[Path | str] = None,
+        workers: int = 4,
+    ):
+        self.client = client
+        self.state_path = Path(state_path) if state_path else STATE_PATH
+        state = _load_state(self.state_path)
+        self.game_ids: Dict[str, str] = state.get("game_ids") or client.game_ids(games or GAMES)
+        self.agg = MonthlyAggregator(state)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+
+    def _live_totals(self, name: str) -> Optional[Tuple[int, int]]:
+        try:
+            return self.client.live_totals(self.game_ids[name])
+        except (requests.RequestException, RuntimeError, ValueError) as e:
+            print(f"{name}: snapshot failed ({e})")
+            return None
+
+    def sample_once(self) -> Dict[str, Tuple[int, int]]:
+        """Snapshot every game under one timestamp; failed games are skipped this round."""
+        ts = time.time()
+        names = list(self.game_ids)
+        results = dict(zip(names, self.pool.map(self._live_totals, names)))
+        totals = {name: t for name, t in results.items() if t is not None}
+        for name, (viewers, streams) in totals.items():
+            self.agg.fold(name, ts, viewers, streams)
+        _save_state(self.state_path, {**self.agg.state(), "game_ids": self.game_ids})
+        return totals
+
+    def run(self, interval: float = 600, rounds: Optional[int] = None) -> None:
+        n = 0
+        while rounds is None or n < rounds:
+            t0 = time.time()
+            totals = self.sample_once()
+            n += 1
+            summary = ", ".join(f"{g}: {v:,} viewers/{s} streams" for g, (v, s) in totals.items())
+            summary += f" ({len(totals)}/{len(self.game_ids)} games)"
+            print(f"{_month_label(t0)} round {n}: {summary}")
+            if rounds is None or n < rounds:
+                time.sleep(max(0.0, interval - (time.time() - t0)))
+
+    def write_clean(self, csv_path: Path | str) -> pd.DataFrame:
+        """
+        Merge the sampled months into `csv_path`: months the aggregator covers are
+        replaced, history (e.g. the TwitchTracker backfill) is kept, and the gain
+        columns are recomputed over the merged series before an atomic replace.
+        """
+        csv_path = Path(csv_path)
+        df = self.agg.to_frame()
+        if csv_path.exists():
+            old = pd.read_csv(csv_path, parse_dates=["month"])
+            old = old[~old["month"].isin(df["month"])]
+            df = pd.concat([old[CLEAN_FIELDS], df], ignore_index=True).sort_values("month")
+            df = df.reset_index(drop=True)
+            df["gain viewers"] = df["peak viewers"].diff().fillna(0.0)
+            df["gain streams"] = df["peak streams"].diff().fillna(0.0)
+        buf = io.StringIO()
+        df.to_csv(buf, index=False, header=True, date_format="%Y-%m-%d")
+        atomic_write_text(csv_path, buf.getvalue())
+        return df
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True)
+        self.client.session.close()
@@ -4,7 +4,6 @@
 
 from __future__ import annotations
 
-import csv
 import json
 import time
 import requests
@@ -12,13 +11,14 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Iterable, Optional, Tuple
 
+from src.checkpoint import CheckpointedSink
+
 SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
 VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
 TOKEN_URL  = "https://oauth2.googleapis.com/token"
 
 # Default output locations
-OUTDIR = Path("data/youtube")
-OUTDIR.mkdir(parents=True, exist_ok=True)
+OUTDIR = Path("data/youtube")  # created on first scrape, not at import
 CSV_PATH = OUTDIR / "monthly_top50.csv"
 STATE_PATH = OUTDIR / "state.json"
 TOKENS_PATH = Path("tokens.json")
@@ -160,89 +160,78 @@ def scrape_monthly_top50(
     state_path: Optional[Path | str] = None,
     tokens_path: Optional[Path | str] = None,
     batch_size: int = 50,
+    commit_every: int = 1,         # months per atomic CSV+state commit
+    fsync_every: int = 12,         # commits between fsyncs
 ) -> int:
     csv_path = Path(csv_path) if csv_path else CSV_PATH
     state_path = Path(state_path) if state_path else STATE_PATH
     tokens_path = Path(tokens_path) if tokens_path else TOKENS_PATH
-    csv_path.parent.mkdir(parents=True, exist_ok=True)
-    state_path.parent.mkdir(parents=True, exist_ok=True)
 
     tm = TokenManager(tokens_path)
 
-    # Ensure CSV header
-    fieldnames = FIELDS + ["month"]
-    if not csv_path.exists():
-        with open(csv_path, "w", newline="", encoding="utf-8") as f:
-            csv.DictWriter(f, fieldnames=fieldnames).writeheader()
-
-    # Load state
-    if state_path.exists():
-        try:
-            st = json.loads(state_path.read_text(encoding="utf-8"))
-        except Exception:
-            st = {}
-        cursor = st.get("cursor")          # last completed month label
-        written_total = int(st.get("written_total", 0))
-    else:
-        st, cursor, written_total = {}, None, 0
+    # Rows + cursor are committed together; a crash mid-month rolls back to the last commit
+    sink = CheckpointedSink(
+        csv_path, state_path, fieldnames=FIELDS + ["month"],
+        commit_every=commit_every, fsync_every=fsync_every,
+    )
+    cursor = sink.state.get("cursor")          # last completed month label
+    written_total = int(sink.state.get("written_total", 0))
 
     # Iterate months
-    for m_start, m_end, m_label in _month_iter(start, end):
-        if cursor and m_label <= cursor:
-            continue
-
-        published_after = m_start.strftime("%Y-%m-%dT00:00:00Z")
-        published_before = m_end.strftime("%Y-%m-%dT00:00:00Z")
-
-        # search.list — top by viewCount
-        params_search = {
-            "part": "id",
-            "q": query,
-            "type": "video",
-            "order": "viewCount",
-            "maxResults": min(50, max(1, batch_size)),
-            "publishedAfter": published_after,
-            "publishedBefore": published_before,
-        }
-        r = tm.request("GET", SEARCH_URL, params=params_search, timeout=30)
-        if r.status_code in (403, 429, 500, 503):
-            time.sleep(2.0)
+    with sink:
+        for m_start, m_end, m_label in _month_iter(start, end):
+            if cursor and m_label <= cursor:
+                continue
+
+            published_after = m_start.strftime("%Y-%m-%dT00:00:00Z")
+            published_before = m_end.strftime("%Y-%m-%dT00:00:00Z")
+
+            # search.list — top by viewCount
+            params_search = {
+                "part": "id",
+                "q": query,
+                "type": "video",
+                "order": "viewCount",
+                "maxResults": min(50, max(1, batch_size)),
+                "publishedAfter": published_after,
+                "publishedBefore": published_before,
+            }
             r = tm.request("GET", SEARCH_URL, params=params_search, timeout=30)
-        r.raise_for_status()
-
-        video_ids = [
-            it["id"]["videoId"]
-            for it in r.json().get("items", [])
-            if isinstance(it.get("id"), dict) and "videoId" in it["id"]
-        ]
-
-        # Even if empty, advance state so teammates resume cleanly
-        if not video_ids:
-            st.update({"cursor": m_label, "written_total": written_total})
-            state_path.write_text(json.dumps(st, indent=2), encoding="utf-8")
-            print(f"{m_label}: no results")
-            continue
-
-        # videos.list — fetch snippet + statistics for found IDs
-        params_videos = {
-            "part": "snippet,statistics",
-            "id": ",".join(video_ids),
-            "maxResults": len(video_ids),
-        }
-        r2 = tm.request("GET", VIDEOS_URL, params=params_videos, timeout=30)
-        if r2.status_code in (403, 429, 500, 503):
-            time.sleep(2.0)
+            if r.status_code in (403, 429, 500, 503):
+                time.sleep(2.0)
+                r = tm.request("GET", SEARCH_URL, params=params_search, timeout=30)
+            r.raise_for_status()
+
+            video_ids = [
+                it["id"]["videoId"]
+                for it in r.json().get("items", [])
+                if isinstance(it.get("id"), dict) and "videoId" in it["id"]
+            ]
+
+            # Even if empty, advance state so teammates resume cleanly
+            if not video_ids:
+                sink.checkpoint(cursor=m_label, written_total=written_total)
+                print(f"{m_label}: no results")
+                continue
+
+            # videos.list — fetch snippet + statistics for found IDs
+            params_videos = {
+                "part": "snippet,statistics",
+                "id": ",".join(video_ids),
+                "maxResults": len(video_ids),
+            }
             r2 = tm.request("GET", VIDEOS_URL, params=params_videos, timeout=30)
-        r2.raise_for_status()
-        items = r2.json().get("items", [])
+            if r2.status_code in (403, 429, 500, 503):
+                time.sleep(2.0)
+                r2 = tm.request("GET", VIDEOS_URL, params=params_videos, timeout=30)
+            r2.raise_for_status()
+            items = r2.json().get("items", [])
 
-        # Append rows
-        with open(csv_path, "a", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=fieldnames)
+            # Buffer rows
             for it in items:
                 snip = it.get("snippet", {}) or {}
                 stats = it.get("statistics", {}) or {}
-                w.writerow({
+                sink.write({
                     "videoId": it.get("id"),
                     "publishedAt": snip.get("publishedAt"),
                     "channelId": snip.get("channelId"),
@@ -258,10 +247,9 @@ def scrape_monthly_top50(
                 })
                 written_total += 1
 
-        # Checkpoint state
-        st.update({"cursor": m_label, "written_total": written_total})
-        state_path.write_text(json.dumps(st, indent=2), encoding="utf-8")
-        print(f"{m_label}: wrote {len(items)} rows (acc total {written_total})")
+            # Checkpoint rows + cursor together
+            sink.checkpoint(cursor=m_label, written_total=written_total)
+            print(f"{m_label}: wrote {len(items)} rows (acc total {written_total})")
 
     print(f"Done. Wrote {written_total} rows → {csv_path}")
     return written_total
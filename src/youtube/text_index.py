@@ -0,0 +1,522 @@
+# src/youtube/text_index.py
+# Persistent inverted index over scraped video titles/descriptions.
+# Boolean + phrase queries, topic tagging, incremental updates as the CSV grows.
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import re
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from src.checkpoint import atomic_write_text
+
+# Default locations
+CSV_PATH = Path("assets/raw/yt_counter_strike.csv")
+INDEX_PATH = Path("data/youtube/text_index.json")
+
+INDEX_VERSION = 3  # v1 could hold records cut mid-description; v2 was a single JSON file
+
+# Columns that get tokenized, in position order
+TEXT_FIELDS = ["title", "description"]
+
+# Topic buckets for batch tagging; values use the query syntax of `TextIndex.search`
+TOPICS: Dict[str, str] = {
+    "esports": (
+        "major OR esports OR esport OR tournament OR playoffs OR finals OR semifinal* OR "
+        "\"grand final\" OR \"semi final\" OR iem OR esl OR blast OR pgl OR navi OR "
+        "\"natus vincere\" OR faze OR fnatic OR vitality OR astralis OR g2 OR liquid OR "
+        "s1mple OR zywoo OR pro OR pros OR professional OR progamer*"
+    ),
+    "skins_cases": (
+        "skin* OR cases OR \"case opening\" OR \"case unboxing\" OR knife OR knives OR "
+        "gloves OR sticker* OR souvenir OR \"trade up\" OR tradeup* OR trading OR "
+        "inventory OR karambit OR \"dragon lore\" OR unbox*"
+    ),
+    "updates": (
+        "update OR patch OR \"patch notes\" OR operation OR beta OR \"release date\" OR "
+        "\"release notes\" OR \"new map\" OR changelog OR \"source 2\" OR announce*"
+    ),
+    "memes": (
+        "funny OR meme OR memes OR fail OR fails OR troll* OR wtf OR lol OR "
+        "bloopers OR \"funny moments\" OR rage OR prank"
+    ),
+}
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+_QUERY_RE = re.compile(r'\s*(?:(?P<phrase>"[^"]*")|(?P<paren>[()])|(?P<word>[^\s()"]+))')
+_OPERATORS = {"AND", "OR", "NOT"}
+
+
+# --------- helpers ---------
+def normalize(text: Optional[str]) -> str:
+    """NFKD-fold, strip combining marks and casefold (so 'Sköll' == 'skoll', 'ＣＳ' == 'cs')."""
+    text = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in text if not unicodedata.combining(c)).casefold()
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split normalized text into alphanumeric tokens ('CS:GO' -> ['cs', 'go'])."""
+    return _TOKEN_RE.findall(normalize(text))
+
+def complete_records_end(chunk: bytes) -> int:
+    """
+    Length of the leading run of complete CSV records in `chunk` (which must start
+    on a record boundary): the last newline outside quotes. Quoted fields may hold
+    newlines, and `""` escapes toggle twice, so quote parity between newlines is enough.
+    """
+    end = pos = 0
+    in_quotes = False
+    while True:
+        nl = chunk.find(b"\n", pos)
+        if nl < 0:
+            return end
+        if chunk.count(b'"', pos, nl) % 2:
+            in_quotes = not in_quotes
+        if not in_quotes:
+            end = nl + 1
+        pos = nl + 1
+
+def _to_int(val) -> int:
+    try:
+        return int(float(val))
+    except (TypeError, ValueError):
+        return 0
+
+
+# --------- index ---------
+class TextIndex:
+    """
+    Positional inverted index keyed by integer doc ids.
+
+    - `docs[i]` = [videoId, 'YYYY-MM', viewCount]
+    - `postings[token][doc_id]` = positions; fields are concatenated with a one-slot gap
+      so phrases never match across the title/description boundary.
+    - `source_offset` is the byte offset into the CSV that has been indexed so far,
+      letting `update()` parse only rows appended since the last run.
+    - Saved docs live in immutable binary segments (see `_Segment`); `postings` only
+      holds docs added since the last `save()`, which writes them as one new segment.
+    """
+    def __init__(self):
+        self._next_segment = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self.docs: List[list] = []
+        self.postings: Dict[str, Dict[int, List[int]]] = defaultdict(dict)
+        self.segments: List[_Segment] = []
+        self.seen: Set[str] = set()
+        self.source_offset = 0
+        self.source_header: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    # ---- building ----
+    def add(self, video_id: str, month: str, views: int, texts: Iterable[Optional[str]]) -> Optional[int]:
+        """Index one document; duplicates (same videoId) are ignored. Returns the doc id."""
+        if video_id in self.seen:
+            return None
+        doc_id = len(self.docs)
+        self.docs.append([video_id, month, views])
+        self.seen.add(video_id)
+
+        pos = 0
+        for text in texts:
+            for tok in tokenize(text):
+                self.postings[tok].setdefault(doc_id, []).append(pos)
+                pos += 1
+            pos += 1  # field gap
+        return doc_id
+
+    def add_row(self, row: dict) -> Optional[int]:
+        month = row.get("month") or (row.get("publishedAt") or "")[:7]
+        return self.add(
+            row.get("videoId") or "",
+            month[:7],
+            _to_int(row.get("viewCount")),
+            (row.get(f) for f in TEXT_FIELDS),
+        )
+
+    def update(self, csv_path: Path | str = CSV_PATH) -> int:
+        """
+        Index rows appended to `csv_path` since the last call. If the file shrank
+        (rewritten from scratch) the index is rebuilt. Returns number of docs added.
+        """
+        csv_path = Path(csv_path)
+        size = csv_path.stat().st_size
+        if size < self.source_offset:
+            self._reset()
+        if size == self.source_offset:
+            return 0
+
+        with open(csv_path, "rb") as f:
+            f.seek(self.source_offset)
+            chunk = f.read()
+        # Only consume complete records; a partially flushed row (possibly cut inside
+        # a quoted multi-line description) is picked up next time
+        end = complete_records_end(chunk)
+        if end == 0:
+            return 0
+        text = chunk[:end].decode("utf-8-sig" if self.source_offset == 0 else "utf-8")
+
+        reader = csv.reader(io.StringIO(text, newline=""))
+        if self.source_header is None:
+            self.source_header = next(reader, None)
+            if self.source_header is None:
+                return 0
+
+        added = 0
+        for values in reader:
+            if not values:
+                continue
+            if self.add_row(dict(zip(self.source_header, values))) is not None:
+                added += 1
+        self.source_offset += end
+        return added
+
+    # ---- querying ----
+    def _postings(self, tok: str) -> Dict[int, List[int]]:
+        """{doc id: positions} for `tok` across saved segments and unsaved docs."""
+        out: Dict[int, List[int]] = {}
+        for seg in self.segments:
+            i = seg.index.get(tok)
+            if i is not None:
+                out.update(seg.postings(i))
+        out.update(self.postings.get(tok, {}))
+        return out
+
+    def vocabulary(self) -> Set[str]:
+        out = set(self.postings)
+        for seg in self.segments:
+            out.update(seg.index)
+        return out
+
+    def _phrase(self, tokens: List[str]) -> Set[int]:
+        if not tokens:
+            return set()
+        lists = [self._postings(t) for t in tokens]
+        if any(not p for p in lists):
+            return set()
+        if len(tokens) == 1:
+            return set(lists[0])
+
+        # Docs containing every token, then check positional adjacency
+        candidates = set(lists[0]).intersection(*lists[1:])
+        hits = set()
+        for d in candidates:
+            starts = set(lists[0][d])
+            for k, plist in enumerate(lists[1:], start=1):
+                starts &= {p - k for p in plist[d]}
+                if not starts:
+                    break
+            if starts:
+                hits.add(d)
+        return hits
+
+    def _term(self, word: str) -> Set[int]:
+        if word.endswith("*") and len(word) > 1:
+            prefix = normalize(word[:-1])
+            out: Set[int] = set()
+            for seg in self.segments:
+                for tok, i in seg.index.items():
+                    if tok.startswith(prefix):
+                        out.update(seg.doc_ids(i))
+            for tok, plist in self.postings.items():
+                if tok.startswith(prefix):
+                    out.update(plist)
+            return out
+        # 'cs:go' tokenizes to two tokens -> treat as a phrase
+        return self._phrase(tokenize(word))
+
+    def search(self, query: str) -> Set[int]:
+        """
+        Evaluate a boolean query and return matching doc ids.
+
+        Syntax: terms, "quoted phrases", prefix*, AND / OR / NOT (uppercase),
+        parentheses. Adjacent terms are ANDed: `major "grand final" NOT skin*`.
+        """
+        return _QueryParser(self, query).parse()
+
+    def videos(self, doc_ids: Iterable[int]) -> List[str]:
+        return [self.docs[d][0] for d in sorted(doc_ids)]
+
+    # ---- classification ----
+    def classify(self, topics: Optional[Dict[str, str]] = None) -> Dict[str, Set[int]]:
+        """Run every topic query once; returns {topic: doc ids}. Docs may carry several tags."""
+        topics = topics or TOPICS
+        return {name: self.search(q) for name, q in topics.items()}
+
+    def tags(self, topics: Optional[Dict[str, str]] = None) -> List[List[str]]:
+        """Per-doc topic list, aligned with `docs`."""
+        out: List[List[str]] = [[] for _ in self.docs]
+        for name, ids in self.classify(topics).items():
+            for d in ids:
+                out[d].append(name)
+        return out
+
+    def views_by_topic_month(self, topics: Optional[Dict[str, str]] = None) -> List[dict]:
+        """
+        Rows of {'month', 'topic', 'videos', 'viewCount'} (month as 'YYYY-MM-01'),
+        ready for `pd.DataFrame(rows)`. Untagged docs are reported as topic 'other'.
+        """
+        agg: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0])
+        for d, names in enumerate(self.tags(topics)):
+            _, month, views = self.docs[d]
+            for name in names or ["other"]:
+                cell = agg[(month, name)]
+                cell[0] += 1
+                cell[1] += views
+        return [
+            {"month": f"{m}-01", "topic": t, "videos": n, "viewCount": v}
+            for (m, t), (n, v) in sorted(agg.items())
+        ]
+
+    # ---- persistence ----
+    def save(self, path: Path | str = INDEX_PATH) -> None:
+        """
+        Write unsaved docs as a new segment next to `path`, merging trailing segments
+        of similar size (so there are O(log n) of them), then publish the manifest.
+        Only the new or merged segments are written; older ones are left untouched.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        saved = sum(seg.n_docs for seg in self.segments)
+        if len(self.docs) > saved:
+            self.segments.append(_Segment.from_postings(saved, self.docs[saved:], self.postings))
+            self.postings = defaultdict(dict)
+            while len(self.segments) > 1 and self.segments[-2].n_docs <= 2 * self.segments[-1].n_docs:
+                b, a = self.segments.pop(), self.segments.pop()
+                self.segments.append(_Segment.merge(a, b))
+
+        for seg in self.segments:
+            if seg.name is None:
+                seg.name = f"{path.stem}.seg{self._next_segment:05d}.npz"
+                self._next_segment += 1
+                seg.write(path.parent / seg.name)
+        manifest = {
+            "version": INDEX_VERSION,
+            "source_offset": self.source_offset,
+            "source_header": self.source_header,
+            "next_segment": self._next_segment,
+            "segments": [seg.name for seg in self.segments],
+        }
+        atomic_write_text(path, json.dumps(manifest, indent=2))
+        live = set(manifest["segments"])
+        for old in path.parent.glob(f"{path.stem}.seg*.npz"):
+            if old.name not in live:
+                old.unlink()
+
+    @classmethod
+    def load(cls, path: Path | str = INDEX_PATH) -> "TextIndex":
+        path = Path(path)
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version in {path}: {data.get('version')}")
+        idx = cls()
+        idx.source_offset = int(data["source_offset"])
+        idx.source_header = data["source_header"]
+        idx._next_segment = int(data["next_segment"])
+        for name in data["segments"]:
+            seg = _Segment.read(path.parent / name)
+            idx.segments.append(seg)
+            idx.docs.extend(seg.docs())
+        idx.seen = {d[0] for d in idx.docs}
+        return idx
+
+
+# --------- segments ---------
+def _join(strings: List[str]) -> np.ndarray:
+    return np.frombuffer("\n".join(strings).encode("utf-8"), dtype=np.uint8)
+
+def _split(blob: np.ndarray, n: int) -> List[str]:
+    return blob.tobytes().decode("utf-8").split("\n") if n else []
+
+class _Segment:
+    """
+    Immutable postings for docs [first_doc, first_doc + n_docs), as flat arrays:
+    token i owns pairs tok_ptr[i]:tok_ptr[i+1]; pair k is (doc[k], pos[pos_ptr[k]:pos_ptr[k+1]]).
+    Loading is a few array reads; postings are decoded per token when queried.
+    """
+    def __init__(self, first_doc: int, vocab: List[str], arrays: Dict[str, np.ndarray],
+                 video_ids: List[str], months: List[str], name: Optional[str] = None):
+        self.first_doc = first_doc
+        self.vocab = vocab
+        self.index = {tok: i for i, tok in enumerate(vocab)}
+        self.tok_ptr = arrays["tok_ptr"]
+        self.doc = arrays["doc"]
+        self.pos_ptr = arrays["pos_ptr"]
+        self.pos = arrays["pos"]
+        self.views = arrays["views"]
+        self.video_ids = video_ids
+        self.months = months
+        self.name = name
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.video_ids)
+
+    def docs(self) -> List[list]:
+        return [list(d) for d in zip(self.video_ids, self.months, self.views.tolist())]
+
+    def doc_ids(self, i: int) -> List[int]:
+        return self.doc[self.tok_ptr[i]:self.tok_ptr[i + 1]].tolist()
+
+    def postings(self, i: int) -> Dict[int, List[int]]:
+        a, b = int(self.tok_ptr[i]), int(self.tok_ptr[i + 1])
+        ptr = self.pos_ptr[a:b + 1].tolist()
+        pos = self.pos[ptr[0]:ptr[-1]].tolist()
+        base = ptr[0]
+        return {d: pos[ptr[k] - base:ptr[k + 1] - base] for k, d in enumerate(self.doc[a:b].tolist())}
+
+    @classmethod
+    def from_postings(cls, first_doc: int, docs: List[list], postings: Dict[str, Dict[int, List[int]]]) -> "_Segment":
+        vocab = sorted(t for t, plist in postings.items() if plist)
+        tok_ptr, doc, lens, pos = [0], [], [], []
+        for tok in vocab:
+            for d, plist in sorted(postings[tok].items()):
+                doc.append(d)
+                lens.append(len(plist))
+                pos.extend(plist)
+            tok_ptr.append(len(doc))
+        arrays = {
+            "tok_ptr": np.asarray(tok_ptr, dtype=np.int32),
+            "doc": np.asarray(doc, dtype=np.int32),
+            "pos_ptr": np.concatenate([[0], np.cumsum(lens)]).astype(np.int32),
+            "pos": np.asarray(pos, dtype=np.int32),
+            "views": np.asarray([d[2] for d in docs], dtype=np.int64),
+        }
+        return cls(first_doc, vocab, arrays, [d[0] for d in docs], [d[1] for d in docs])
+
+    @classmethod
+    def merge(cls, a: "_Segment", b: "_Segment") -> "_Segment":
+        """Combine adjacent segments (a's docs precede b's) without decoding postings."""
+        vocab = sorted(a.index.keys() | b.index.keys())
+        where = {tok: i for i, tok in enumerate(vocab)}
+        tok_of = lambda seg: np.repeat(
+            np.asarray([where[t] for t in seg.vocab], dtype=np.int64), np.diff(seg.tok_ptr)
+        )
+        pair_tok = np.concatenate([tok_of(a), tok_of(b)])
+        order = np.argsort(pair_tok, kind="stable")  # a's pairs stay ahead of b's per token
+
+        lens = np.concatenate([np.diff(a.pos_ptr), np.diff(b.pos_ptr)])[order]
+        starts = np.concatenate([a.pos_ptr[:-1], b.pos_ptr[:-1] + len(a.pos)])[order]
+        pos_ptr = np.concatenate([[0], np.cumsum(lens)]).astype(np.int32)
+        gather = np.repeat(starts - pos_ptr[:-1], lens) + np.arange(pos_ptr[-1])
+        arrays = {
+            "tok_ptr": np.concatenate([[0], np.cumsum(np.bincount(pair_tok, minlength=len(vocab)))])
+                         .astype(np.int32),
+            "doc": np.concatenate([a.doc, b.doc])[order],
+            "pos_ptr": pos_ptr,
+            "pos": np.concatenate([a.pos, b.pos])[gather],
+            "views": np.concatenate([a.views, b.views]),
+        }
+        return cls(a.first_doc, vocab, arrays, a.video_ids + b.video_ids, a.months + b.months)
+
+    def write(self, path: Path) -> None:
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f, first_doc=np.int64(self.first_doc), vocab=_join(self.vocab),
+                tok_ptr=self.tok_ptr, doc=self.doc, pos_ptr=self.pos_ptr, pos=self.pos,
+                views=self.views, video_ids=_join(self.video_ids), months=_join(self.months),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def read(cls, path: Path) -> "_Segment":
+        with np.load(path) as z:
+            arrays = {k: z[k] for k in z.files}
+        n_vocab, n_docs = len(arrays["tok_ptr"]) - 1, len(arrays["views"])
+        return cls(
+            int(arrays["first_doc"]), _split(arrays["vocab"], n_vocab), arrays,
+            _split(arrays["video_ids"], n_docs), _split(arrays["months"], n_docs), name=path.name,
+        )
+
+
+# --------- query parser ---------
+class _QueryParser:
+    """Recursive descent: or := and ('OR' and)* ; and := not (['AND'] not)* ; not := 'NOT' not | atom."""
+    def __init__(self, index: TextIndex, query: str):
+        self.index = index
+        self.tokens = [m.group(m.lastgroup) for m in _QUERY_RE.finditer(query) if m.lastgroup]
+        self.i = 0
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.i] if self.i < len(self.tokens) else None
+
+    def _next(self) -> str:
+        tok = self.tokens[self.i]
+        self.i += 1
+        return tok
+
+    def parse(self) -> Set[int]:
+        if not self.tokens:
+            return set()
+        result = self._or()
+        if self._peek() is not None:
+            raise ValueError(f"Unexpected token {self._peek()!r} in query")
+        return result
+
+    def _or(self) -> Set[int]:
+        result = self._and()
+        while self._peek() == "OR":
+            self._next()
+            result = result | self._and()
+        return result
+
+    def _and(self) -> Set[int]:
+        result = self._not()
+        while self._peek() not in (None, "OR", ")"):
+            if self._peek() == "AND":
+                self._next()
+            result = result & self._not()
+        return result
+
+    def _not(self) -> Set[int]:
+        if self._peek() == "NOT":
+            self._next()
+            return set(range(len(self.index))) - self._not()
+        return self._atom()
+
+    def _atom(self) -> Set[int]:
+        tok = self._peek()
+        if tok is None or tok in _OPERATORS or tok == ")":
+            raise ValueError(f"Expected a term, got {tok!r}")
+        self._next()
+        if tok == "(":
+            result = self._or()
+            if self._peek() != ")":
+                raise ValueError("Unbalanced parentheses in query")
+            self._next()
+            return result
+        if tok.startswith('"'):
+            return self.index._phrase(tokenize(tok.strip('"')))
+        return self.index._term(tok)
+
+
+# --------- convenience ---------
+def build_or_update(
+    csv_path: Optional[Path | str] = None,
+    index_path: Optional[Path | str] = None,
+) -> TextIndex:
+    """Load the saved index (if any), fold in newly appended CSV rows, and persist."""
+    csv_path = Path(csv_path) if csv_path else CSV_PATH
+    index_path = Path(index_path) if index_path else INDEX_PATH
+    idx = TextIndex()
+    if index_path.exists():
+        try:
+            idx = TextIndex.load(index_path)
+        except ValueError as e:
+            print(f"{e}; rebuilding.")
+    added = idx.update(csv_path)
+    if added or not index_path.exists():
+        idx.save(index_path)
+    print(f"Indexed {added} new videos ({len(idx)} total) → {index_path}")
+    return idx
@@ -0,0 +1,148 @@
+# test/test_checkpoint.py
+# Crash/recovery semantics of CheckpointedSink: the state file is the commit point,
+# bytes past its data_offset are dropped on reopen, and resumed runs never duplicate rows.
+
+from __future__ import annotations
+
+import csv
+import json
+from pathlib import Path
+
+import pytest
+
+import src.checkpoint as checkpoint
+from src.checkpoint import OFFSET_KEY, CheckpointedSink
+
+FIELDS = ["month", "value"]
+
+
+def _rows(path: Path) -> list:
+    with open(path, newline="", encoding="utf-8") as f:
+        return [(r["month"], r["value"]) for r in csv.DictReader(f)]
+
+def _sink(tmp_path: Path, **kwargs) -> CheckpointedSink:
+    return CheckpointedSink(tmp_path / "data.csv", tmp_path / "state.json", fieldnames=FIELDS, **kwargs)
+
+def _collect(sink: CheckpointedSink, months, crash_after: int = None) -> None:
+    """Resumable collector loop: one row per month, cursor checkpointed after each."""
+    for n, month in enumerate(months):
+        if sink.state.get("cursor") and month <= sink.state["cursor"]:
+            continue
+        if crash_after is not None and n == crash_after:
+            raise KeyboardInterrupt
+        sink.write({"month": month, "value": n})
+        sink.checkpoint(cursor=month)
+
+MONTHS = [f"2024-{m:02d}" for m in range(1, 7)]
+EXPECTED = [(m, str(n)) for n, m in enumerate(MONTHS)]
+
+
+def test_commit_and_resume(tmp_path: Path):
+    with _sink(tmp_path) as sink:
+        _collect(sink, MONTHS[:3])
+    with _sink(tmp_path) as sink:
+        assert sink.state["cursor"] == MONTHS[2]
+        _collect(sink, MONTHS)
+    assert _rows(tmp_path / "data.csv") == EXPECTED
+
+
+def test_uncheckpointed_rows_are_dropped(tmp_path: Path):
+    with _sink(tmp_path) as sink:
+        _collect(sink, MONTHS[:2])
+        sink.write({"month": "2024-03", "value": 99})  # never checkpointed
+    assert _rows(tmp_path / "data.csv") == EXPECTED[:2]
+
+
+def test_bytes_past_offset_are_truncated(tmp_path: Path):
+    with _sink(tmp_path) as sink:
+        _collect(sink, MONTHS[:2])
+    with open(tmp_path / "data.csv", "a", newline="", encoding="utf-8") as f:
+        f.write("2024-03,torn")  # partial write from a crashed commit
+    with _sink(tmp_path) as sink:
+        _collect(sink, MONTHS)
+    assert _rows(tmp_path / "data.csv") == EXPECTED
+
+
+@pytest.mark.parametrize("fail_on", [1, 3])
+def test_crash_before_state_is_published(tmp_path: Path, monkeypatch, fail_on: int):
+    """Data written and fsynced, but the state rename never happened."""
+    real, calls = checkpoint.atomic_write_text, []
+
+    def flaky(path, text, fsync=False):
+        calls.append(path)
+        if len(calls) == fail_on:
+            raise OSError("simulated crash")
+        real(path, text, fsync)
+
+    monkeypatch.setattr(checkpoint, "atomic_write_text", flaky)
+    sink = _sink(tmp_path)
+    with pytest.raises(OSError):
+        _collect(sink, MONTHS)
+    sink._f.close()
+    monkeypatch.setattr(checkpoint, "atomic_write_text", real)
+
+    with _sink(tmp_path) as sink:
+        assert sink.state.get("cursor") == (MONTHS[fail_on - 2] if fail_on > 1 else None)
+        _collect(sink, MONTHS)
+    assert _rows(tmp_path / "data.csv") == EXPECTED
+
+
+def test_interrupted_collector_resumes_without_duplicates(tmp_path: Path):
+    sink = _sink(tmp_path, commit_every=2)
+    with pytest.raises(KeyboardInterrupt):
+        _collect(sink, MONTHS, crash_after=3)
+    sink._f.close()  # process death: no close(), the third checkpoint is lost
+    with _sink(tmp_path) as sink:
+        assert sink.state["cursor"] == MONTHS[1]
+        _collect(sink, MONTHS)
+    assert _rows(tmp_path / "data.csv") == EXPECTED
+
+
+def test_orphan_data_without_state_is_truncated(tmp_path: Path):
+    (tmp_path / "data.csv").write_text("month,value\n2024-01,0\n", encoding="utf-8")
+    with _sink(tmp_path) as sink:
+        assert sink.state == {}
+        _collect(sink, MONTHS)
+    assert _rows(tmp_path / "data.csv") == EXPECTED
+
+
+def test_legacy_state_with_cursor_is_trusted(tmp_path: Path):
+    (tmp_path / "data.csv").write_text("month,value\r\n2024-01,0\r\n", encoding="utf-8")
+    (tmp_path / "state.json").write_text(json.dumps({"cursor": "2024-01"}), encoding="utf-8")
+    with _sink(tmp_path) as sink:
+        _collect(sink, MONTHS)
+    assert _rows(tmp_path / "data.csv") == EXPECTED
+    assert json.loads((tmp_path / "state.json").read_text())[OFFSET_KEY] > 0
+
+
+def test_data_shorter_than_checkpoint_raises(tmp_path: Path):
+    with _sink(tmp_path) as sink:
+        _collect(sink, MONTHS[:2])
+    with open(tmp_path / "data.csv", "r+b") as f:
+        f.truncate(5)
+    with pytest.raises(RuntimeError, match="delete both"):
+        _sink(tmp_path)
+
+
+def test_reset_interrupted_before_truncate(tmp_path: Path, monkeypatch):
+    with _sink(tmp_path) as sink:
+        _collect(sink, MONTHS[:3])
+    sink = _sink(tmp_path)
+    monkeypatch.setattr(sink._f, "truncate", lambda *_: (_ for _ in ()).throw(OSError("crash")))
+    with pytest.raises(OSError):
+        sink.reset()
+    sink._f.close()
+    with _sink(tmp_path) as sink:
+        assert sink.state == {OFFSET_KEY: 0}
+        _collect(sink, MONTHS)
+    assert _rows(tmp_path / "data.csv") == EXPECTED
+
+
+def test_jsonl_stage(tmp_path: Path):
+    data, state = tmp_path / "stage.jsonl", tmp_path / "stage_state.json"
+    with CheckpointedSink(data, state, fmt="jsonl") as sink:
+        sink.write_rows([{"id": 1}, {"id": 2}])
+        sink.checkpoint(page=0)
+        sink.write({"id": 3})
+    lines = data.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(x) for x in lines] == [{"id": 1}, {"id": 2}]
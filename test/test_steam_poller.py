@@ -0,0 +1,102 @@
+# test/test_steam_poller.py
+# SteamPoller + TimeSeriesStore against a local http.server stub of the Steam Web API.
+
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src.steam import poller
+from src.steam.poller import SteamPoller, clean_monthly, franchise_appids, load_apps
+from src.steam.store import TimeSeriesStore
+
+APP_LIST = [
+    {"appid": 901, "name": "Call of Duty®: Black Ops 4"},
+    {"appid": 902, "name": "Call of Duty®: Modern Warfare®"},
+    {"appid": 903, "name": "Call of Duty®: Modern Warfare® Remastered"},
+    {"appid": 904, "name": "Call of Duty®: Black Ops Cold War"},
+    {"appid": 905, "name": "Call of Duty®: Vanguard"},
+    {"appid": 906, "name": "Call of Duty®: Vanguard"},  # ambiguous: left unresolved
+]
+PLAYERS = {10: 100, 730: 5000, 901: 40}
+FAILING = {240}  # always 503
+
+
+@pytest.fixture
+def stub():
+    hits = {"applist": 0, "players": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/applist":
+                hits["applist"] += 1
+                body = {"applist": {"apps": APP_LIST}}
+            else:
+                hits["players"] += 1
+                appid = int(parse_qs(url.query)["appid"][0])
+                if appid in FAILING:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                body = {"response": {"player_count": PLAYERS.get(appid, 0), "result": 1}}
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", hits
+    server.shutdown()
+
+
+def test_load_apps_caches_resolved_and_unresolved(stub, tmp_path: Path):
+    base, hits = stub
+    cache = tmp_path / "app_ids.json"
+    apps = load_apps(cache, url=f"{base}/applist")
+    assert hits["applist"] == 1
+    assert {901, 902, 904} <= set(apps) and 903 not in apps and 905 not in apps
+    assert json.loads(cache.read_text())["apps"]["Call of Duty: Vanguard"] is None
+
+    # unresolved names are not looked up again until retry_after has passed
+    assert load_apps(cache, url=f"{base}/applist") == apps
+    assert hits["applist"] == 1
+    load_apps(cache, url=f"{base}/applist", retry_after=0)
+    assert hits["applist"] == 2
+
+    # an id pinned by hand is used as-is
+    data = json.loads(cache.read_text())
+    data["apps"]["Call of Duty: Vanguard"] = 905
+    cache.write_text(json.dumps(data))
+    assert load_apps(cache, url=f"{base}/applist")[905] == "Call of Duty Vanguard"
+    assert hits["applist"] == 2
+
+
+def test_poller_rounds_into_store(stub, tmp_path: Path, monkeypatch):
+    base, hits = stub
+    monkeypatch.setattr(poller.time, "sleep", lambda s: None)
+    apps = {10: "Counter-Strike", 240: "Counter-Strike Source", 730: "Counter-Strike 2", 901: "Call of Duty Black Ops 4"}
+    with TimeSeriesStore(tmp_path / "steam") as store:
+        p = SteamPoller(store, apps=apps, url=f"{base}/players")
+        try:
+            p.run(interval=0, rounds=3)
+        finally:
+            p.close()
+
+    with TimeSeriesStore(tmp_path / "steam") as store:
+        raw = store.samples()
+        assert len(raw) == 9  # 3 rounds x 3 apps; the failing app is skipped each round
+        assert set(raw["appid"].tolist()) == {10, 730, 901}
+        df = clean_monthly(store, franchise_appids("Counter-Strike", apps))
+        assert df["peak"].tolist() == [5100.0]
+        assert df[["gain", "% gain"]].iloc[0].tolist() == [0.0, 0.0]
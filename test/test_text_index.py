@@ -0,0 +1,86 @@
+# test/test_text_index.py
+# Incremental TextIndex updates must match a full build, even when the CSV is cut
+# inside a quoted multi-line description (the append-while-scraping case).
+
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+
+import pytest
+
+from src.youtube.text_index import CSV_PATH, TextIndex
+
+FIELDS = ["videoId", "publishedAt", "title", "description", "viewCount"]
+
+
+def _snapshot(idx: TextIndex):
+    return idx.docs, {tok: idx._postings(tok) for tok in idx.vocabulary()}
+
+def _full(path: Path) -> TextIndex:
+    idx = TextIndex()
+    idx.update(path)
+    return idx
+
+def _cut_then_update(src: bytes, cut: int, path: Path) -> TextIndex:
+    idx = TextIndex()
+    path.write_bytes(src[:cut])
+    idx.update(path)
+    path.write_bytes(src)
+    idx.update(path)
+    return idx
+
+
+@pytest.fixture
+def multiline_csv(tmp_path: Path) -> Path:
+    path = tmp_path / "videos.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=FIELDS)
+        w.writeheader()
+        for i in range(20):
+            w.writerow({
+                "videoId": f"vid{i:02d}",
+                "publishedAt": f"2024-{i % 12 + 1:02d}-01T00:00:00Z",
+                "title": f"Major grand final {i}",
+                "description": f'Line one\nMusic: "Track {i}"\nLICENSES\nARTIST\n',
+                "viewCount": 100 + i,
+            })
+    return path
+
+
+def test_every_cut_matches_full_build(multiline_csv: Path, tmp_path: Path):
+    src = multiline_csv.read_bytes()
+    expected = _snapshot(_full(multiline_csv))
+    for cut in range(0, len(src) + 1, 7):
+        idx = _cut_then_update(src, cut, tmp_path / "growing.csv")
+        assert _snapshot(idx) == expected, f"cut at byte {cut}"
+
+
+@pytest.mark.skipif(not CSV_PATH.exists(), reason="scraped CSV not present")
+def test_cut_after_embedded_newline_in_repo_csv(tmp_path: Path):
+    src = CSV_PATH.read_bytes()
+    expected = _full(CSV_PATH)
+    # cut right after a newline inside a quoted description
+    body = src.index(b"\n") + 1
+    cut = next(i + 1 for i in range(body, len(src))
+               if src[i] == 0x0A and src.count(b'"', body, i) % 2)
+    idx = _cut_then_update(src, cut, tmp_path / "growing.csv")
+    assert len(idx) == len(expected)
+    assert _snapshot(idx) == _snapshot(expected)
+
+
+def test_segmented_saves_match_full_build(multiline_csv: Path, tmp_path: Path):
+    src = multiline_csv.read_bytes()
+    expected = _snapshot(_full(multiline_csv))
+    growing, index_path = tmp_path / "growing.csv", tmp_path / "index" / "text_index.json"
+    # grow the CSV in steps, reloading and saving each time (new segment per save + merges)
+    for cut in list(range(0, len(src), len(src) // 9)) + [len(src)]:
+        growing.write_bytes(src[:cut])
+        idx = TextIndex.load(index_path) if index_path.exists() else TextIndex()
+        idx.update(growing)
+        idx.save(index_path)
+    idx = TextIndex.load(index_path)
+    assert _snapshot(idx) == expected
+    assert idx.search('"grand final" AND music') == set(range(20))
+    segments = list(index_path.parent.glob("*.npz"))
+    assert 1 <= len(segments) < 9